@@ -1,22 +1,31 @@
 import os
+import logging
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from app.config.tiers import get_tier_options
+from app.utils.slow_query_sampler import slow_query_sampler
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class MongoDB:
     client = None
     db = None
+    _collections = {}
 
     @classmethod
     def connect(cls):
         if cls.client is None:
             try:
-                cls.client = MongoClient(os.getenv("MONGODB_URI"))
+                event_listeners = []
+                if os.getenv("SLOW_QUERY_SAMPLER_ENABLED", "true").lower() == "true":
+                    event_listeners.append(slow_query_sampler)
+                cls.client = MongoClient(os.getenv("MONGODB_URI"), event_listeners=event_listeners)
                 cls.db = cls.client[os.getenv("DATABASE_NAME")]
-                print("Connected to MongoDB successfully!")
+                logger.info("Connected to MongoDB successfully!")
             except Exception as e:
-                print(f"Error connecting to MongoDB: {e}")
+                logger.error(f"Error connecting to MongoDB: {e}")
                 raise e
 
     @classmethod
@@ -25,10 +34,21 @@ class MongoDB:
             cls.connect()
         return cls.db
 
+    @classmethod
+    def get_collection(cls, name: str, operation: str = None):
+        """Mengembalikan collection dengan read preference/write concern sesuai tier operasi."""
+        key = (name, operation)
+        if key not in cls._collections:
+            collection = cls.get_database()[name]
+            options = get_tier_options(operation) if operation else {}
+            cls._collections[key] = collection.with_options(**options) if options else collection
+        return cls._collections[key]
+
     @classmethod
     def close_connection(cls):
         if cls.client:
             cls.client.close()
             cls.client = None
             cls.db = None
-            print("MongoDB connection closed.")
\ No newline at end of file
+            cls._collections = {}
+            logger.info("MongoDB connection closed.")
\ No newline at end of file
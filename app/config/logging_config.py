@@ -0,0 +1,125 @@
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from dotenv import load_dotenv
+
+from app.utils.metrics import register_metrics
+
+load_dotenv()
+
+# Request ID untuk korelasi log dalam satu request (diisi oleh LoggingMiddleware)
+request_id_var: ContextVar[str] = ContextVar("request_id", default=None)
+
+# Atribut bawaan LogRecord yang tidak perlu disalin sebagai field tambahan
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Memformat LogRecord menjadi satu baris JSON, termasuk field dari `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key != "request_id" and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Traceback yang sudah diformat oleh NonBlockingQueueHandler.prepare
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+_traceback_formatter = logging.Formatter()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler yang tidak pernah memblokir event loop: jika antrean penuh, log dibuang
+    dan dihitung, bukan menunggu writer thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # request_id harus diambil di thread pemanggil, sebelum record pindah ke writer thread
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        # QueueHandler.prepare bawaan menggabungkan traceback ke `msg` dan menghapus exc_info;
+        # di sini pesan dan traceback diformat terpisah agar JsonFormatter menulisnya ke field "exception"
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+_listener: QueueListener = None
+_queue_handler: NonBlockingQueueHandler = None
+
+def setup_logging() -> None:
+    """Memasang pipeline logging JSON: logger -> antrean terbatas -> writer thread -> stdout."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    register_metrics("logging", get_logging_metrics)
+
+def start_logging() -> None:
+    setup_logging()
+    if _listener is not None and _listener._thread is None:
+        _listener.start()
+
+def stop_logging() -> None:
+    # Menunggu writer thread menghabiskan antrean sebelum proses berhenti
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+def get_logging_metrics() -> dict:
+    if _queue_handler is None:
+        return {}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "queue_capacity": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped
+    }
@@ -0,0 +1,55 @@
+import json
+import os
+from pymongo.read_preferences import Primary, PrimaryPreferred, SecondaryPreferred
+from pymongo.write_concern import WriteConcern
+from pymongo.read_concern import ReadConcern
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# MongoDB mensyaratkan maxStalenessSeconds minimal 90 detik
+MAX_STALENESS_SECONDS = max(90, int(os.getenv("MONGO_MAX_STALENESS_SECONDS", 90)))
+
+# Definisi tier: kombinasi read preference, read concern, dan write concern
+TIERS = {
+    "primary_read": {
+        "read_preference": Primary(),
+    },
+    "secondary_read": {
+        "read_preference": SecondaryPreferred(max_staleness=MAX_STALENESS_SECONDS),
+    },
+    "primary_preferred_read": {
+        "read_preference": PrimaryPreferred(max_staleness=MAX_STALENESS_SECONDS),
+    },
+    "majority_write": {
+        "write_concern": WriteConcern(w="majority"),
+        "read_concern": ReadConcern("majority"),
+    },
+    "fast_write": {
+        "write_concern": WriteConcern(w=1),
+    },
+}
+
+# Tier default per operasi service; dapat di-override lewat env MONGO_OPERATION_TIERS (JSON),
+# misal: {"students.get_all": "primary_read"}
+OPERATION_TIERS = {
+    "students.create": "majority_write",
+    "students.update": "majority_write",
+    "students.bulk": "majority_write",
+    "students.soft_delete": "fast_write",
+    "students.get_by_id": "primary_read",
+    "students.get_all": "secondary_read",
+    "students.changes": "secondary_read",
+    "users.get_by_id": "primary_read",
+    "users.get_all": "secondary_read",
+}
+OPERATION_TIERS.update(json.loads(os.getenv("MONGO_OPERATION_TIERS", "{}")))
+
+def get_tier_options(operation: str) -> dict:
+    """Mengembalikan opsi `Collection.with_options` untuk operasi tertentu."""
+    tier = OPERATION_TIERS.get(operation)
+    if tier is None:
+        return {}
+    if tier not in TIERS:
+        raise ValueError(f"Unknown MongoDB tier '{tier}' for operation '{operation}'")
+    return TIERS[tier]
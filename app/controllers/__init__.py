@@ -3,5 +3,7 @@ Controllers package initialization
 """
 from app.controllers.user_controller import router as user_router
 from app.controllers.student_controller import router as student_router
+from app.controllers.admin_controller import router as admin_router
+from app.controllers.job_controller import router as job_router
 
-__all__ = ['user_router', 'student_router']
\ No newline at end of file
+__all__ = ['user_router', 'student_router', 'admin_router', 'job_router']
\ No newline at end of file
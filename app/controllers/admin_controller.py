@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from app.middlewares.auth_middleware import JWTBearer
+from app.utils.metrics import collect_metrics
+from app.utils.response import create_response
+from app.services.job_service import job_runner
+from app.utils.slow_query_sampler import slow_query_sampler
+
+router = APIRouter()
+
+@router.get("/metrics", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def get_metrics():
+    return create_response(True, "Metrics retrieved successfully", collect_metrics())
+
+@router.post("/archive/run", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def run_archive():
+    # Dijalankan sebagai background job; pantau progres lewat GET /jobs/{job_id}
+    result = job_runner.submit("archive", {})
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(result))
+
+@router.get("/slow-queries", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def get_slow_queries():
+    return create_response(True, "Slow queries retrieved successfully", slow_query_sampler.get_slow_queries())
+
+@router.delete("/slow-queries", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def reset_slow_queries():
+    slow_query_sampler.reset()
+    return create_response(True, "Slow query samples cleared")
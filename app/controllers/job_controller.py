@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from typing import Optional
+from app.models.job_model import JobSubmit
+from app.services.job_service import job_runner
+from app.middlewares.auth_middleware import JWTBearer, get_current_user
+
+router = APIRouter()
+
+@router.post("/", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def submit_job(job: JobSubmit, current_user: dict = Depends(get_current_user)):
+    result = job_runner.submit(job.type, job.params, current_user["id"])
+    if not result["success"]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=result
+        )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(result)
+    )
+
+@router.get("/{job_id}", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def get_job(job_id: str):
+    result = job_runner.get_job(job_id)
+    if not result["success"]:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content=result
+        )
+    return result
+
+@router.get("/", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def list_jobs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    job_type: Optional[str] = Query(None, alias="type")
+):
+    return job_runner.list_jobs(skip, limit, status_filter, job_type)
+
+@router.post("/{job_id}/cancel", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def cancel_job(job_id: str):
+    result = job_runner.cancel(job_id)
+    if not result["success"]:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT if result["error"] == "JOB_FINISHED" else status.HTTP_404_NOT_FOUND,
+            content=result
+        )
+    return result
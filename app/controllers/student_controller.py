@@ -1,30 +1,105 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
-from app.models.student_model import Student, StudentUpdate
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, status
+from app.models.student_model import StudentResponse, Student, StudentUpdate, StudentBulkUpdate, StudentBulkDelete
 from app.services.student_service import StudentService
+from app.services.archive_service import get_archive_service
 from app.middlewares.auth_middleware import JWTBearer, get_current_user
 from app.utils.response import create_response
-from typing import Optional
-from fastapi.responses import JSONResponse
+from app.utils.idempotency import idempotency_store, fingerprint
+from typing import Optional, Literal
+from datetime import datetime
+from fastapi.responses import JSONResponse, Response
+from fastapi.encoders import jsonable_encoder
+from app.utils.result_cache import list_cache
+from app.utils.causal_session import causal_sessions
+from app.utils.fieldsets import parse_fields, parse_expand
+import asyncio
+import json
 
 router = APIRouter()
 student_service = StudentService()
 
 @router.post("/create", response_model=dict, dependencies=[Depends(JWTBearer())])
-async def create_student(student: Student, current_user: dict = Depends(get_current_user)):
+async def create_student(
+    student: Student,
+    current_user: dict = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
     # Set created_by dengan ID user yang sedang login
     student.created_by = current_user["id"]
-    
-    result = student_service.create_student(student)
+
+    async def handler():
+        result = await student_service.create_student_async(student, current_user["id"])
+        return (status.HTTP_200_OK if result["success"] else status.HTTP_400_BAD_REQUEST), result
+
+    # Retry dengan Idempotency-Key yang sama mengembalikan respons pertama tanpa menulis ulang ke database
+    status_code, content, replayed = await idempotency_store.execute(
+        f"students.create:{current_user['id']}",
+        idempotency_key,
+        fingerprint(student.model_dump(include={"nim", "name", "email", "study_program", "semester", "gpa"})),
+        handler
+    )
+    return JSONResponse(
+        status_code=status_code,
+        content=content,
+        headers={"Idempotent-Replayed": "true"} if replayed else None
+    )
+
+@router.post("/bulk/update", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def bulk_update_students(payload: StudentBulkUpdate):
+    return student_service.bulk_update_students(payload)
+
+@router.post("/bulk/delete", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def bulk_delete_students(payload: StudentBulkDelete):
+    return student_service.bulk_soft_delete_students(payload)
+
+@router.get("/changes", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def get_student_changes(
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    source: Literal["index", "stream"] = "index"
+):
+    if source == "stream":
+        # Change stream menunggu event secara blocking; jalankan di thread agar event loop tidak tertahan
+        result = await asyncio.to_thread(student_service.get_student_changes_from_stream, cursor, limit)
+    else:
+        result = student_service.get_student_changes(since, cursor, limit)
     if not result["success"]:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content=result 
+            content=result
         )
     return result
 
+@router.get("/suggest", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def suggest_students(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix of a student name or NIM"),
+    limit: int = Query(10, ge=1, le=20)
+):
+    return student_service.suggest_students(q, limit)
+
 @router.get("/{student_id}", response_model=dict, dependencies=[Depends(JWTBearer())])
-async def get_student(student_id: str):
-    result = student_service.get_student_by_id(student_id)
+async def get_student(
+    student_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. nim,name"),
+    expand: Optional[str] = Query(None, description="Related documents to embed, e.g. created_by"),
+    current_user: dict = Depends(get_current_user)
+):
+    field_names, error = parse_fields(fields, StudentResponse)
+    if error:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=create_response(False, error, None, "INVALID_FIELDS")
+        )
+    expand_names, error = parse_expand(expand, ("created_by",))
+    if not error and expand_names and field_names and "created_by" not in field_names:
+        error = "expand=created_by requires created_by in fields"
+    if error:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=create_response(False, error, None, "INVALID_EXPAND")
+        )
+    result = student_service.get_student_by_id(student_id, current_user["id"], field_names, expand_names)
     if not result["success"]:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,20 +112,56 @@ async def get_all_students(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     study_program: Optional[str] = None,
-    semester: Optional[int] = None
+    semester: Optional[int] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. nim,name"),
+    expand: Optional[str] = Query(None, description="Related documents to embed, e.g. created_by"),
+    current_user: dict = Depends(get_current_user)
 ):
+    field_names, error = parse_fields(fields, StudentResponse)
+    if error:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=create_response(False, error, None, "INVALID_FIELDS")
+        )
+    expand_names, error = parse_expand(expand, ("created_by",))
+    if not error and expand_names and field_names and "created_by" not in field_names:
+        error = "expand=created_by requires created_by in fields"
+    if error:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=create_response(False, error, None, "INVALID_EXPAND")
+        )
+
     filters = {}
     if study_program:
         filters["study_program"] = study_program
     if semester:
         filters["semester"] = semester
-        
-    result = student_service.get_all_students(skip, limit, filters)
-    return result
+
+    # Respons list disimpan dalam bentuk bytes; write melalui StudentService membatalkan cache
+    cache_key = (tuple(sorted(filters.items())), skip, limit, field_names, expand_names)
+    # Pemanggil yang baru saja menulis membaca lewat causal session (read-your-writes): jangan dilayani dari cache,
+    # dan hasilnya tidak disimpan karena halaman dari secondary lain bisa saja belum memuat write tersebut
+    use_cache = not causal_sessions.has_pending_write(current_user["id"])
+    cached_body = list_cache.get("students", cache_key) if use_cache else None
+    if cached_body is not None:
+        return Response(content=cached_body, media_type="application/json")
+
+    generation = list_cache.generation("students")
+    result = student_service.get_all_students(skip, limit, filters, current_user["id"], field_names, expand_names)
+    body = json.dumps(jsonable_encoder(result), separators=(",", ":")).encode("utf-8")
+    if result["success"] and use_cache:
+        list_cache.put("students", cache_key, body, generation)
+    return Response(content=body, media_type="application/json")
 
 @router.put("/{student_id}", response_model=dict, dependencies=[Depends(JWTBearer())])
-async def update_student(student_id: str, student_data: StudentUpdate):
-    result = student_service.update_student(student_id, student_data)
+async def update_student(
+    student_id: str,
+    student_data: StudentUpdate,
+    merge: bool = Query(False, description="Merge with concurrent changes to other fields instead of failing on a stale version"),
+    current_user: dict = Depends(get_current_user)
+):
+    result = student_service.update_student(student_id, student_data, current_user["id"], merge)
     if not result["success"]:
         if result["error"] == "VERSION_CONFLICT":
             # ✅ Kembalikan JSONResponse dengan status 409
@@ -67,10 +178,20 @@ async def update_student(student_id: str, student_data: StudentUpdate):
 
 @router.delete("/{student_id}", response_model=dict, dependencies=[Depends(JWTBearer())])
 async def delete_student(student_id: str, current_user: dict = Depends(get_current_user)):
-    result = student_service.soft_delete_student(student_id)
+    result = student_service.soft_delete_student(student_id, current_user["id"])
     if not result["success"]:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content=result 
         )
+    return result
+
+@router.post("/{student_id}/restore", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def restore_student(student_id: str):
+    result = get_archive_service().restore("students", student_id)
+    if not result["success"]:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND if result["error"] == "NOT_FOUND" else status.HTTP_400_BAD_REQUEST,
+            content=result
+        )
     return result
\ No newline at end of file
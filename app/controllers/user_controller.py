@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from app.models.user_model import User, UserLogin, UserUpdate
+import math
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, status, Query
+from app.models.user_model import UserResponse, User, UserLogin, UserUpdate, RefreshTokenRequest
 from app.services.user_service import UserService
+from app.services.archive_service import get_archive_service
 from app.middlewares.auth_middleware import JWTBearer, get_current_user
 from app.utils.response import create_response
+from app.utils.rate_limiter import login_rate_limiter
+from app.utils.idempotency import idempotency_store, fingerprint
+from app.utils.fieldsets import parse_fields
 from fastapi.responses import JSONResponse
 
 router = APIRouter()
@@ -10,18 +16,40 @@ user_service = UserService()
 
 #Regsiter Akun
 @router.post("/register", response_model=dict)
-async def register_user(user: User):
-    result = user_service.create_user(user)
-    if not result["success"]:
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content=result 
-        )
-    return result
+async def register_user(
+    user: User,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
+    async def handler():
+        result = user_service.create_user(user)
+        return (status.HTTP_200_OK if result["success"] else status.HTTP_400_BAD_REQUEST), result
+
+    # Password tidak ikut di-hash ke dalam fingerprint yang disimpan
+    status_code, content, replayed = await idempotency_store.execute(
+        "users.register",
+        idempotency_key,
+        fingerprint(user.model_dump(include={"username", "email", "full_name"})),
+        handler
+    )
+    return JSONResponse(
+        status_code=status_code,
+        content=content,
+        headers={"Idempotent-Replayed": "true"} if replayed else None
+    )
 
 #Login
 @router.post("/login", response_model=dict)
-async def login_user(user: UserLogin):
+async def login_user(user: UserLogin, request: Request):
+    # Tolak lebih awal sebelum query database dan verifikasi bcrypt dijalankan
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_rate_limiter.check(client_ip, user.email)
+    if retry_after is not None:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content=create_response(False, "Too many login attempts, please try again later", None, "RATE_LIMITED"),
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
     token = user_service.authenticate_user(user.email, user.password)
     if not token:
        # ✅ Buat konten error kustom Anda
@@ -33,11 +61,56 @@ async def login_user(user: UserLogin):
             content=error_content,
             headers={"WWW-Authenticate": "Bearer"},
         )
+    login_rate_limiter.reset_email(user.email)
     return create_response(True, "Login successful", token)
 
+#Refresh Token
+@router.post("/token/refresh", response_model=dict)
+async def refresh_token(payload: RefreshTokenRequest):
+    token = user_service.refresh_access_token(payload.refresh_token)
+    if not token:
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content=create_response(False, "Invalid or expired refresh token", None, "INVALID_REFRESH_TOKEN"),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return create_response(True, "Token refreshed successfully", token)
+
+#Logout (cabut refresh token beserta seluruh rotasinya)
+@router.post("/token/revoke", response_model=dict)
+async def revoke_token(payload: RefreshTokenRequest):
+    result = user_service.revoke_refresh_token(payload.refresh_token)
+    if not result["success"]:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content=result
+        )
+    return result
+
+#Cabut access token yang sedang dipakai sebelum kedaluwarsa
+@router.post("/token/revoke-access", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def revoke_access_token(current_user: dict = Depends(get_current_user)):
+    result = user_service.revoke_access_token(current_user)
+    if not result["success"]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=result
+        )
+    return result
+
 @router.get("/{user_id}", response_model=dict, dependencies=[Depends(JWTBearer())])
-async def get_user(user_id: str):
-    result = user_service.get_user_by_id(user_id)
+async def get_user(
+    user_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,email"),
+    current_user: dict = Depends(get_current_user)
+):
+    field_names, error = parse_fields(fields, UserResponse)
+    if error:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=create_response(False, error, None, "INVALID_FIELDS")
+        )
+    result = user_service.get_user_by_id(user_id, current_user["id"], field_names)
     if not result["success"]:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -48,14 +121,22 @@ async def get_user(user_id: str):
 @router.get("/", response_model=dict, dependencies=[Depends(JWTBearer())])
 async def get_all_users(
     skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,email"),
+    current_user: dict = Depends(get_current_user)
 ):
-    result = user_service.get_all_users(skip, limit)
+    field_names, error = parse_fields(fields, UserResponse)
+    if error:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=create_response(False, error, None, "INVALID_FIELDS")
+        )
+    result = user_service.get_all_users(skip, limit, current_user["id"], field_names)
     return result
 
 @router.put("/{user_id}", response_model=dict, dependencies=[Depends(JWTBearer())])
 async def update_user(user_id: str, user_data: UserUpdate, current_user: dict = Depends(get_current_user)):
-    result = user_service.update_user(user_id, user_data)
+    result = user_service.update_user(user_id, user_data, current_user["id"])
     if not result["success"]:
         if result["error"] == "VERSION_CONFLICT":
            # ✅ Kembalikan JSONResponse dengan status 409
@@ -78,4 +159,14 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_use
             status_code=status.HTTP_404_NOT_FOUND,
             content=result
         )
+    return result
+
+@router.post("/{user_id}/restore", response_model=dict, dependencies=[Depends(JWTBearer())])
+async def restore_user(user_id: str):
+    result = get_archive_service().restore("users", user_id)
+    if not result["success"]:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND if result["error"] == "NOT_FOUND" else status.HTTP_400_BAD_REQUEST,
+            content=result
+        )
     return result
\ No newline at end of file
@@ -1,12 +1,31 @@
 import os
-from fastapi import FastAPI
+import asyncio
+import logging
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from pymongo.errors import PyMongoError, ServerSelectionTimeoutError
 from app.routes.user_routes import router as user_routes
 from app.routes.student_routes import router as student_routes
+from app.routes.admin_routes import router as admin_routes
+from app.routes.job_routes import router as job_routes
 from app.config.database import MongoDB
+from app.middlewares.compression_middleware import CompressionMiddleware
+from app.middlewares.logging_middleware import LoggingMiddleware
+from app.middlewares.admission_middleware import AdmissionMiddleware
+from app.middlewares.deadline_middleware import DeadlineMiddleware, deadline_stats
+from app.config.logging_config import setup_logging, start_logging, stop_logging
+from app.utils.jwt_engine import get_token_engine
+from app.services.archive_service import schedule_archive_jobs
+from app.services.job_service import job_runner
+from app.services.typeahead_service import typeahead_service
+from app.utils.response import create_response
+from app.utils.revocation import revocation_registry
 from dotenv import load_dotenv
 import uvicorn
 
 load_dotenv()
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="University Backend API",
@@ -14,18 +33,69 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Kompresi respons (br/zstd/gzip) sesuai Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+# Batas concurrency per grup route; request berlebih diantrekan sebentar lalu ditolak 503
+app.add_middleware(AdmissionMiddleware)
+# Deadline per request (maxTimeMS ke MongoDB) dan pembatalan saat klien memutus koneksi
+app.add_middleware(DeadlineMiddleware)
+# Access log JSON dengan request ID (middleware terluar agar mencakup seluruh durasi request)
+app.add_middleware(LoggingMiddleware)
+
+# Query yang melewati deadline request dikembalikan sebagai 504 dengan kode error tersendiri
+@app.exception_handler(PyMongoError)
+async def database_error_handler(request: Request, exc: PyMongoError):
+    # Gagal memilih server berarti database tidak terjangkau, bukan query yang melewati deadline
+    if isinstance(exc, ServerSelectionTimeoutError):
+        deadline_stats["database_unavailable"] += 1
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=create_response(False, "Database is unavailable, please retry later", None, "DATABASE_UNAVAILABLE"),
+            headers={"Retry-After": "5"}
+        )
+    if not exc.timeout:
+        raise exc
+    deadline_stats["deadline_exceeded"] += 1
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content=create_response(False, "Request deadline exceeded", None, "DEADLINE_EXCEEDED")
+    )
+
 # Event handlers
+background_tasks = []
+
 @app.on_event("startup")
 async def startup_event():
+    start_logging()
+    # Validasi key/codec JWT saat startup, bukan saat token pertama ditandatangani atau diverifikasi
+    get_token_engine()
     MongoDB.connect()
+    revocation_registry.start()
+    if os.getenv("TYPEAHEAD_ENABLED", "true").lower() == "true":
+        typeahead_service.start()
+    if os.getenv("JOB_RUNNER_ENABLED", "true").lower() == "true":
+        await job_runner.start()
+    if os.getenv("ARCHIVE_ENABLED", "false").lower() == "true":
+        # Pengarsipan berjalan sebagai job `archive` di job runner (concurrency, cancel, status)
+        if os.getenv("JOB_RUNNER_ENABLED", "true").lower() != "true":
+            logger.warning("ARCHIVE_ENABLED is set but the job runner is disabled on this worker; archive jobs stay queued until a worker with the runner picks them up")
+        background_tasks.append(asyncio.create_task(schedule_archive_jobs()))
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    for task in background_tasks:
+        task.cancel()
+    revocation_registry.stop()
+    typeahead_service.stop()
+    await job_runner.stop()
     MongoDB.close_connection()
+    stop_logging()
 
 # Include routers
 app.include_router(user_routes)
 app.include_router(student_routes)
+app.include_router(admin_routes)
+app.include_router(job_routes)
 
 # Health check endpoint
 @app.get("/")
@@ -36,6 +106,11 @@ async def root():
 async def health_check():
     return {"status": "healthy", "database": "connected" if MongoDB.db is not None else "disconnected"}
 
+# Public key untuk verifikasi token secara offline oleh service lain
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    return get_token_engine().jwks()
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
     host = os.getenv("HOST", "127.0.0.1")
@@ -2,5 +2,9 @@
 Middlewares package initialization
 """
 from app.middlewares.auth_middleware import JWTBearer, get_current_user
+from app.middlewares.compression_middleware import CompressionMiddleware
+from app.middlewares.logging_middleware import LoggingMiddleware
+from app.middlewares.admission_middleware import AdmissionMiddleware
+from app.middlewares.deadline_middleware import DeadlineMiddleware
 
-__all__ = ['JWTBearer', 'get_current_user']
\ No newline at end of file
+__all__ = ['JWTBearer', 'get_current_user', 'CompressionMiddleware', 'LoggingMiddleware', 'AdmissionMiddleware', 'DeadlineMiddleware']
\ No newline at end of file
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import math
+import os
+from collections import deque
+
+from app.utils.metrics import register_metrics
+from app.utils.response import create_response
+
+# (grup, method, prefix path); aturan pertama yang cocok dipakai, method None berarti semua method
+ROUTE_GROUPS = [
+    ("auth", None, "/users/login"),
+    ("auth", None, "/users/register"),
+    ("auth", None, "/users/token"),
+    ("exports", "GET", "/students/changes"),
+    ("student_reads", "GET", "/students"),
+    ("student_writes", None, "/students"),
+]
+
+DEFAULT_LIMITS = "auth=20,student_reads=100,student_writes=50,exports=4,default=100"
+
+def _parse_limits(value: str) -> dict:
+    """Format: "auth=20,exports=4" -> {"auth": 20, "exports": 4}."""
+    limits = {}
+    for item in value.split(","):
+        group, _, limit = item.strip().partition("=")
+        if group and limit:
+            limits[group] = int(limit)
+    return limits
+
+
+class _Budget:
+    """Slot concurrency untuk satu grup route beserta antrean FIFO yang menunggu slot kosong."""
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiters = deque()
+        self.stats = {"admitted": 0, "queued": 0, "shed_queue_full": 0, "shed_timeout": 0, "max_queue_depth": 0}
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            self.stats["admitted"] += 1
+            return True
+        if len(self.waiters) >= self.max_queue:
+            self.stats["shed_queue_full"] += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        self.stats["queued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self.waiters))
+        try:
+            # asyncio.wait tidak membatalkan future saat timeout, sehingga slot yang baru diberikan tidak hilang
+            await asyncio.wait({future}, timeout=timeout)
+        except asyncio.CancelledError:
+            # Klien memutus koneksi saat masih mengantre
+            self._abandon(future)
+            raise
+        if future.done():
+            self.stats["admitted"] += 1
+            return True
+        self._abandon(future)
+        self.stats["shed_timeout"] += 1
+        return False
+
+    def _abandon(self, future) -> None:
+        if future.done() and not future.cancelled():
+            # Slot sudah diberikan tapi tidak dipakai; teruskan ke antrean berikutnya
+            self.release()
+            return
+        future.cancel()
+        try:
+            self.waiters.remove(future)
+        except ValueError:
+            pass
+
+    def release(self) -> None:
+        # Slot langsung dipindahkan ke request berikutnya di antrean tanpa mengurangi `active`
+        while self.waiters:
+            future = self.waiters.popleft()
+            if not future.done():
+                future.set_result(True)
+                return
+        self.active -= 1
+
+    def get_metrics(self) -> dict:
+        return {"limit": self.limit, "active": self.active, "queue_depth": len(self.waiters), **self.stats}
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI untuk membatasi jumlah request yang diproses bersamaan per grup route.
+    Request yang melebihi budget menunggu di antrean sampai ADMISSION_QUEUE_TIMEOUT_MS;
+    jika antrean penuh atau waktu tunggu habis, request langsung ditolak 503 dengan Retry-After
+    agar worker tidak menumpuk request saat database melambat. `/health` selalu dikecualikan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        limits = _parse_limits(DEFAULT_LIMITS)
+        limits.update(_parse_limits(os.getenv("ADMISSION_LIMITS", "")))
+        queue_factor = float(os.getenv("ADMISSION_QUEUE_FACTOR", 2))
+        self.budgets = {
+            group: _Budget(limit, max(0, int(limit * queue_factor)))
+            for group, limit in limits.items()
+        }
+        self.queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", 500)) / 1000
+        self.retry_after = str(max(1, math.ceil(float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", 1)))))
+        exempt = os.getenv("ADMISSION_EXEMPT_PATHS", "/health")
+        self.exempt_paths = {p.strip() for p in exempt.split(",") if p.strip()} | {"/health"}
+        register_metrics("admission", self.get_metrics)
+
+    def _group(self, method: str, path: str) -> str:
+        for group, group_method, prefix in ROUTE_GROUPS:
+            if (group_method is None or group_method == method) and path.startswith(prefix):
+                return group
+        return "default"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.budgets.get(self._group(scope["method"], scope["path"]))
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await budget.acquire(self.queue_timeout):
+            await self._shed(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            budget.release()
+
+    async def _shed(self, send) -> None:
+        body = json.dumps(create_response(False, "Server is busy, please retry later", None, "OVERLOADED")).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", self.retry_after.encode("latin-1")),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def get_metrics(self) -> dict:
+        return {
+            "queue_timeout_ms": self.queue_timeout * 1000,
+            "groups": {group: budget.get_metrics() for group, budget in self.budgets.items()}
+        }
@@ -1,6 +1,7 @@
-from fastapi import HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.utils.security import decode_access_token
+from app.utils.revocation import revocation_registry
 
 class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = True):
@@ -32,13 +33,14 @@ class JWTBearer(HTTPBearer):
             payload = decode_access_token(jwtoken)
         except:
             payload = None
-        if payload:
+        # Cek revocation hanya lookup set in-memory, tanpa query database
+        if payload and not revocation_registry.is_revoked(payload):
             isTokenValid = True
         return isTokenValid
 
-def get_current_user(token: str):
+def get_current_user(token: str = Depends(JWTBearer())):
     payload = decode_access_token(token)
-    if not payload:
+    if not payload or revocation_registry.is_revoked(payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
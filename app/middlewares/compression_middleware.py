@@ -0,0 +1,270 @@
+import os
+import threading
+import time
+import zlib
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from app.utils.metrics import register_metrics
+
+load_dotenv()
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        import brotli
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        import zstandard
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def _is_available(encoding: str) -> bool:
+    # brotli dan zstandard bersifat opsional; encoding dilewati jika paketnya tidak terpasang
+    module = {"br": "brotli", "zstd": "zstandard"}.get(encoding)
+    if module is None:
+        return True
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def _merge_vary(headers: list) -> list:
+    """Menambahkan Accept-Encoding ke header Vary yang sudah ada, atau membuat header Vary baru."""
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            tokens = [token.strip().lower() for token in value.split(b",")]
+            if b"accept-encoding" not in tokens and b"*" not in tokens:
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionStats:
+    """Akumulasi byte sebelum/sesudah kompresi dan waktu CPU per encoding."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_ms": 0.0})
+            stats["responses"] += 1
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+            stats["cpu_ms"] += seconds * 1000
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for encoding, stats in self._stats.items():
+                saved = stats["bytes_in"] - stats["bytes_out"]
+                result[encoding] = {
+                    **stats,
+                    "bytes_saved": saved,
+                    "ratio": round(stats["bytes_out"] / stats["bytes_in"], 4) if stats["bytes_in"] else None,
+                    "bytes_saved_per_cpu_ms": round(saved / stats["cpu_ms"], 1) if stats["cpu_ms"] else None
+                }
+            return result
+
+
+compression_stats = CompressionStats()
+register_metrics("compression", compression_stats.snapshot)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI untuk kompresi respons (br/zstd/gzip) berdasarkan header Accept-Encoding.
+    Respons yang lebih kecil dari `minimum_size`, sudah ter-encode, atau berasal dari path
+    yang dikecualikan dikirim apa adanya. Respons streaming dikompres per chunk dan setiap chunk
+    di-flush, sehingga klien (mis. SSE) menerima data tanpa menunggu respons selesai.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: Optional[int] = None,
+        encodings: Optional[List[str]] = None,
+        excluded_paths: Optional[List[str]] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+        configured = encodings or [e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip").split(",") if e.strip()]
+        self.encodings = [e for e in configured if e in ("br", "zstd", "gzip") and _is_available(e)]
+        self.excluded_paths = excluded_paths if excluded_paths is not None else [
+            p.strip() for p in os.getenv("COMPRESSION_EXCLUDED_PATHS", "/health").split(",") if p.strip()
+        ]
+        self.levels = {
+            "gzip": int(os.getenv("GZIP_LEVEL", 6)),
+            "br": int(os.getenv("BROTLI_QUALITY", 4)),
+            "zstd": int(os.getenv("ZSTD_LEVEL", 3))
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings or self._is_excluded(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def _is_excluded(self, path: str) -> bool:
+        return any(path == p or path.startswith(p.rstrip("/") + "/") for p in self.excluded_paths)
+
+    def _negotiate(self, scope) -> Optional[str]:
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1").lower()
+                break
+        if not accept:
+            return None
+
+        accepted = {}
+        for part in accept.split(","):
+            token, _, params = part.strip().partition(";")
+            q = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[token.strip()] = q
+
+        # Urutan preferensi server menentukan pilihan di antara encoding dengan q tertinggi
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def create_compressor(self, encoding: str):
+        level = self.levels[encoding]
+        if encoding == "br":
+            return _BrotliCompressor(level)
+        if encoding == "zstd":
+            return _ZstdCompressor(level)
+        return _GzipCompressor(level)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def _compress(self, body: bytes, final: bool) -> bytes:
+        start = time.perf_counter()
+        data = self.compressor.compress(body)
+        # Chunk non-final di-flush agar tidak tertahan di buffer compressor sampai respons selesai
+        data += self.compressor.finish() if final else self.compressor.flush()
+        self.cpu_seconds += time.perf_counter() - start
+        self.bytes_in += len(body)
+        self.bytes_out += len(data)
+        return data
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            # Tunda pengiriman header sampai ukuran body pertama diketahui
+            self.start_message = message
+            headers = {k.lower(): v for k, v in message.get("headers", [])}
+            if b"content-encoding" in headers:
+                self.passthrough = True
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            if self.start_message is not None:
+                await self._send(self.start_message)
+                self.start_message = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            headers = [(k, v) for k, v in self.start_message.get("headers", []) if k.lower() != b"content-length"]
+
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                self.start_message = None
+                await self._send(message)
+                return
+
+            self.compressor = self.middleware.create_compressor(self.encoding)
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+            headers = _merge_vary(headers)
+
+            if not more_body:
+                data = self._compress(body, final=True)
+                headers.append((b"content-length", str(len(data)).encode("latin-1")))
+                await self._send({**self.start_message, "headers": headers})
+                self.start_message = None
+                await self._send({"type": "http.response.body", "body": data})
+                self._record()
+                return
+
+            await self._send({**self.start_message, "headers": headers})
+            self.start_message = None
+
+        data = self._compress(body, final=not more_body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+        if not more_body:
+            self._record()
+
+    def _record(self):
+        compression_stats.record(self.encoding, self.bytes_in, self.bytes_out, self.cpu_seconds)
@@ -0,0 +1,117 @@
+import asyncio
+import math
+import os
+
+import pymongo
+
+from app.utils.metrics import register_metrics
+
+# Dinaikkan oleh exception handler di main.py dan oleh middleware ini
+deadline_stats = {"deadline_exceeded": 0, "aborted_on_disconnect": 0, "database_unavailable": 0}
+register_metrics("deadlines", lambda: dict(deadline_stats))
+
+def _parse_route_deadlines(value: str) -> list:
+    """Format: "/students/changes=30000,/users=3000" -> [(prefix, ms)], prefix terpanjang didahulukan."""
+    deadlines = []
+    for item in value.split(","):
+        prefix, _, ms = item.strip().partition("=")
+        if prefix and ms:
+            deadlines.append((prefix, float(ms)))
+    return sorted(deadlines, key=lambda d: len(d[0]), reverse=True)
+
+
+class DeadlineMiddleware:
+    """
+    Middleware ASGI yang memberi setiap request batas waktu (deadline).
+    Deadline dipasang dengan `pymongo.timeout()`, sehingga setiap find, count, dan update di dalam request
+    otomatis dikirim dengan `maxTimeMS` sebesar sisa waktu; query yang melewati deadline dihentikan di server.
+    Jika klien memutus koneksi sebelum respons selesai, pemrosesan request dibatalkan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.default_ms = float(os.getenv("REQUEST_DEADLINE_MS", 10000))
+        self.max_ms = float(os.getenv("REQUEST_DEADLINE_MAX_MS", 60000))
+        self.route_deadlines = _parse_route_deadlines(os.getenv("REQUEST_DEADLINES", "/students/changes=30000"))
+
+    def _deadline_ms(self, scope) -> float:
+        for name, value in scope["headers"]:
+            if name == b"x-request-timeout-ms":
+                try:
+                    requested = float(value.decode("latin-1"))
+                except ValueError:
+                    break
+                # nan/inf lolos dari clamp min/max dan akan mematikan deadline; pakai default
+                if not math.isfinite(requested):
+                    break
+                return min(max(requested, 1.0), self.max_ms)
+        for prefix, ms in self.route_deadlines:
+            if scope["path"].startswith(prefix):
+                return ms
+        return self.default_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with pymongo.timeout(self._deadline_ms(scope) / 1000):
+            await self._run_until_disconnect(scope, receive, send)
+
+    async def _run_until_disconnect(self, scope, receive, send):
+        headers = dict(scope["headers"])
+        has_body = b"transfer-encoding" in headers or headers.get(b"content-length", b"0") != b"0"
+
+        body_done = asyncio.Event()
+        disconnected = asyncio.Event()
+        response_done = False
+        empty_body_pending = not has_body
+        if not has_body:
+            body_done.set()
+
+        # Setelah body terbaca, `receive` asli hanya dipanggil oleh watcher; aplikasi menunggu event disconnect
+        async def wrapped_receive():
+            nonlocal empty_body_pending
+            if body_done.is_set():
+                if empty_body_pending:
+                    empty_body_pending = False
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+                body_done.set()
+            elif not message.get("more_body", False):
+                body_done.set()
+            return message
+
+        async def wrapped_send(message):
+            nonlocal response_done
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_done = True
+
+        app_task = asyncio.create_task(self.app(scope, wrapped_receive, wrapped_send))
+
+        async def watch_disconnect():
+            await body_done.wait()
+            # Untuk request tanpa body, pesan pertama masih `http.request` kosong; lewati sampai disconnect
+            while not disconnected.is_set():
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+            # Disconnect setelah respons terkirim adalah penutupan normal, bukan pembatalan
+            if not response_done and not app_task.done():
+                deadline_stats["aborted_on_disconnect"] += 1
+                app_task.cancel()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            app_task.cancel()
+            if not disconnected.is_set():
+                raise
+        finally:
+            watcher.cancel()
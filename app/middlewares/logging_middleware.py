@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from uuid import uuid4
+
+from app.config.logging_config import request_id_var
+
+access_logger = logging.getLogger("app.access")
+error_logger = logging.getLogger("app.error")
+
+def _parse_sample_rates(value: str) -> list:
+    """Format: "/students=0.1,/users=0.5" -> [("/students", 0.1), ("/users", 0.5)], prefix terpanjang didahulukan."""
+    rates = []
+    for item in value.split(","):
+        prefix, _, rate = item.strip().partition("=")
+        if prefix and rate:
+            rates.append((prefix, float(rate)))
+    return sorted(rates, key=lambda r: len(r[0]), reverse=True)
+
+
+class LoggingMiddleware:
+    """
+    Middleware ASGI untuk access log JSON per request dengan request ID.
+    Route bervolume tinggi dapat di-sampling lewat LOG_SAMPLE_RATES; respons 5xx dan request lambat selalu dicatat.
+    Request yang dibatalkan karena klien memutus koneksi sebelum respons selesai dicatat dengan status 499
+    dan `client_disconnected: true`, bukan sebagai error 500.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sample_rates = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "/health=0"))
+        self.slow_request_ms = float(os.getenv("LOG_SLOW_REQUEST_MS", 1000))
+
+    def _sample_rate(self, path: str) -> float:
+        for prefix, rate in self.sample_rates:
+            if path.startswith(prefix):
+                return rate
+        return 1.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid4().hex
+        token = request_id_var.set(request_id)
+
+        status_code = 500
+        response_started = False
+        response_done = False
+        disconnected = False
+        start = time.perf_counter()
+
+        # DeadlineMiddleware (lapisan dalam) menerima `http.disconnect` lewat receive ini lalu membatalkan request
+        async def receive_wrapper():
+            nonlocal disconnected
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected = True
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_started, response_done
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_done = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except asyncio.CancelledError:
+            disconnected = True
+            raise
+        except Exception:
+            error_logger.exception("Unhandled exception", extra={"method": scope["method"], "path": scope["path"]})
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            # Disconnect setelah respons selesai adalah penutupan normal
+            client_disconnected = disconnected and not response_done
+            if client_disconnected and not response_started:
+                status_code = 499
+            if (
+                client_disconnected
+                or status_code >= 500
+                or duration_ms >= self.slow_request_ms
+                or random.random() < self._sample_rate(scope["path"])
+            ):
+                access_logger.info(
+                    "request",
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "client_disconnected": client_disconnected,
+                        "duration_ms": round(duration_ms, 2),
+                        "client": scope["client"][0] if scope.get("client") else None
+                    }
+                )
+            request_id_var.reset(token)
@@ -1,10 +1,12 @@
 """
 Models package initialization
 """
-from app.models.user_model import User, UserInDB, UserResponse, UserLogin, UserUpdate
-from app.models.student_model import Student, StudentResponse, StudentUpdate
+from app.models.user_model import User, UserInDB, UserResponse, UserLogin, UserUpdate, RefreshTokenRequest
+from app.models.job_model import JobSubmit
+from app.models.student_model import Student, StudentResponse, StudentUpdate, StudentBulkUpdate, StudentBulkDelete
 
 __all__ = [
-    'User', 'UserInDB', 'UserResponse', 'UserLogin', 'UserUpdate',
-    'Student', 'StudentResponse', 'StudentUpdate'
+    'User', 'UserInDB', 'UserResponse', 'UserLogin', 'UserUpdate', 'RefreshTokenRequest',
+    'Student', 'StudentResponse', 'StudentUpdate', 'StudentBulkUpdate', 'StudentBulkDelete',
+    'JobSubmit'
 ]
\ No newline at end of file
@@ -0,0 +1,6 @@
+from typing import Any, Dict
+from pydantic import BaseModel, Field
+
+class JobSubmit(BaseModel):
+    type: str = Field(..., min_length=1, max_length=100)
+    params: Dict[str, Any] = Field(default_factory=dict)
@@ -1,10 +1,10 @@
 import re
 from uuid import uuid4
 from datetime import datetime, timezone
-from typing import Optional, Annotated
+from typing import Optional, Annotated, Dict, List
 
 from bson import ObjectId
-from pydantic import BaseModel, Field, BeforeValidator, field_validator, ConfigDict
+from pydantic import BaseModel, Field, BeforeValidator, field_validator, model_validator, ConfigDict
 
 # --- Tipe Kustom untuk ObjectId ---
 # Helper function ini akan mengonversi ObjectId dari BSON menjadi string.
@@ -94,6 +94,49 @@ class StudentUpdate(BaseModel):
             raise ValueError('Invalid email format')
         return v
 
+# --- Model untuk Operasi Bulk (update/soft delete banyak mahasiswa sekaligus) ---
+class StudentBulkFilter(BaseModel):
+    study_program: Optional[str] = None
+    semester: Optional[int] = Field(None, ge=1, le=14)
+
+
+class StudentBulkTarget(BaseModel):
+    # Pilih target berdasarkan daftar ID atau filter, tidak keduanya
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[StudentBulkFilter] = None
+    # Opsional: versi yang diharapkan per ID untuk optimistic locking
+    expected_versions: Optional[Dict[str, int]] = None
+
+    @model_validator(mode="after")
+    def validate_target(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of 'ids' or 'filter'")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("Filter must contain at least one field")
+        if self.expected_versions and self.ids is None:
+            raise ValueError("'expected_versions' can only be used together with 'ids'")
+        return self
+
+
+class StudentBulkUpdate(StudentBulkTarget):
+    study_program: Optional[str] = Field(None, min_length=3, max_length=100)
+    semester: Optional[int] = Field(None, ge=1, le=14)
+    gpa: Optional[float] = Field(None, ge=0.0, le=4.0)
+    # Misal: 1 untuk menaikkan semester seluruh angkatan
+    semester_increment: Optional[int] = Field(None, ge=-13, le=13)
+
+    @model_validator(mode="after")
+    def validate_update(self):
+        if self.semester is not None and self.semester_increment is not None:
+            raise ValueError("Use either 'semester' or 'semester_increment', not both")
+        if all(v is None for v in (self.study_program, self.semester, self.gpa, self.semester_increment)):
+            raise ValueError("No data provided to update")
+        return self
+
+
+class StudentBulkDelete(StudentBulkTarget):
+    pass
+
 # from pydantic import BaseModel, Field, validator
 # from typing import Optional
 # from datetime import datetime
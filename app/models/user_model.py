@@ -53,6 +53,9 @@ class UserLogin(BaseModel):
             raise ValueError('Invalid email format')
         return v
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str = Field(..., min_length=1)
+
 class UserUpdate(BaseModel):
     username: Optional[str] = Field(None, min_length=3, max_length=50)
     email: Optional[str] = Field(None, min_length=5, max_length=100)
@@ -3,5 +3,7 @@ Routes package initialization
 """
 from app.routes.user_routes import router as user_router
 from app.routes.student_routes import router as student_router
+from app.routes.admin_routes import router as admin_router
+from app.routes.job_routes import router as job_router
 
-__all__ = ['user_router', 'student_router']
\ No newline at end of file
+__all__ = ['user_router', 'student_router', 'admin_router', 'job_router']
\ No newline at end of file
@@ -0,0 +1,5 @@
+from fastapi import APIRouter
+from app.controllers.admin_controller import router as admin_router
+
+router = APIRouter()
+router.include_router(admin_router, prefix="/admin", tags=["admin"])
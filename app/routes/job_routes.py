@@ -0,0 +1,5 @@
+from fastapi import APIRouter
+from app.controllers.job_controller import router as job_router
+
+router = APIRouter()
+router.include_router(job_router, prefix="/jobs", tags=["jobs"])
\ No newline at end of file
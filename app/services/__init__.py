@@ -3,5 +3,8 @@ Services package initialization
 """
 from app.services.user_service import UserService
 from app.services.student_service import StudentService
+from app.services.archive_service import ArchiveService
+from app.services.job_service import JobRunner, job_runner
+from app.services.typeahead_service import TypeaheadService, typeahead_service
 
-__all__ = ['UserService', 'StudentService']
\ No newline at end of file
+__all__ = ['UserService', 'StudentService', 'ArchiveService', 'JobRunner', 'job_runner', 'TypeaheadService', 'typeahead_service']
\ No newline at end of file
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+from app.config.database import MongoDB
+from app.utils.metrics import register_metrics
+from app.utils.response import create_response
+from app.utils.result_cache import list_cache
+from app.services.job_service import job_runner
+
+logger = logging.getLogger(__name__)
+
+# Collection hot -> collection arsip
+ARCHIVE_COLLECTIONS = {
+    "students": "students_archive",
+    "users": "users_archive",
+}
+
+class ArchiveService:
+    """
+    Memindahkan dokumen yang sudah di-soft delete lebih dari N hari ke collection arsip,
+    agar collection utama dan index-nya hanya berisi data yang masih aktif.
+    """
+
+    def __init__(self):
+        self.db = MongoDB.get_database()
+        self.retention_days = int(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+        self.batch_size = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+        purge_days = os.getenv("ARCHIVE_PURGE_AFTER_DAYS")
+        self.last_runs = {}
+        self._lock = threading.Lock()
+
+        for source, target in ARCHIVE_COLLECTIONS.items():
+            # Index parsial: hanya dokumen terhapus, dipakai oleh query pemilihan kandidat arsip
+            self.db[source].create_index(
+                [("deleted_at", 1)],
+                partialFilterExpression={"is_deleted": True},
+                name="deleted_at_archive_candidates"
+            )
+            if purge_days:
+                # TTL opsional: dokumen arsip dihapus permanen setelah N hari
+                self.db[target].create_index([("archived_at", 1)], expireAfterSeconds=int(purge_days) * 86400)
+            else:
+                self.db[target].create_index([("archived_at", 1)])
+
+    def _collection_stats(self, name: str) -> dict:
+        stats = self.db.command("collStats", name)
+        return {"count": stats.get("count", 0), "size_bytes": stats.get("size", 0), "index_size_bytes": stats.get("totalIndexSize", 0)}
+
+    def archive_collection(self, source: str) -> dict:
+        """Archives soft-deleted documents older than the retention period, in batches."""
+        target = ARCHIVE_COLLECTIONS[source]
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        query = {"is_deleted": True, "deleted_at": {"$lt": cutoff}}
+
+        before = self._collection_stats(source)
+        archived = 0
+        while True:
+            docs = list(self.db[source].find(query).limit(self.batch_size))
+            if not docs:
+                break
+
+            now = datetime.now(timezone.utc)
+            # Upsert dulu ke arsip baru kemudian hapus dari hot collection, sehingga aman dijalankan ulang jika terhenti
+            self.db[target].bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": now}, upsert=True) for doc in docs],
+                ordered=False
+            )
+            result = self.db[source].delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}, "is_deleted": True})
+            archived += result.deleted_count
+            if result.deleted_count == 0:
+                break
+
+        run = {
+            "archived": archived,
+            "cutoff": cutoff.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "before": before,
+            "after": self._collection_stats(source)
+        }
+        with self._lock:
+            self.last_runs[source] = run
+        return run
+
+    def run(self) -> dict:
+        return {source: self.archive_collection(source) for source in ARCHIVE_COLLECTIONS}
+
+    def restore(self, source: str, document_id: str) -> dict:
+        """Moves an archived document back into its hot collection as an active record."""
+        try:
+            obj_id = ObjectId(document_id)
+        except InvalidId:
+            return create_response(False, "Invalid ID format", None, "INVALID_ID")
+
+        target = ARCHIVE_COLLECTIONS[source]
+        doc = self.db[target].find_one({"_id": obj_id})
+        if not doc:
+            return create_response(False, "Archived document not found", None, "NOT_FOUND")
+
+        if source == "users" and self.db[source].find_one({"email": doc.get("email"), "is_deleted": False}):
+            return create_response(False, "User with this email already exists", None, "DUPLICATE_EMAIL")
+
+        doc.pop("archived_at", None)
+        now = datetime.now(timezone.utc)
+        doc.update({
+            "is_deleted": False,
+            "deleted_at": None,
+            "updated_at": now,
+            "version": doc.get("version", 1) + 1
+        })
+        try:
+            self.db[source].insert_one(doc)
+        except DuplicateKeyError:
+            error = "DUPLICATE_NIM" if source == "students" else "DUPLICATE_KEY"
+            return create_response(False, "An active record with the same unique key already exists", None, error)
+
+        self.db[target].delete_one({"_id": obj_id})
+        list_cache.bump(source)
+        return create_response(True, "Document restored successfully", {"id": str(obj_id), "version": doc["version"]})
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "retention_days": self.retention_days,
+                "last_runs": dict(self.last_runs)
+            }
+
+
+archive_service = None
+
+def get_archive_service() -> ArchiveService:
+    global archive_service
+    if archive_service is None:
+        archive_service = ArchiveService()
+        register_metrics("archive", archive_service.get_metrics)
+    return archive_service
+
+def submit_scheduled_archive(interval_seconds: float) -> dict:
+    """Submits the `archive` job for the current schedule slot; at most one job is queued per slot."""
+    # Setiap worker menjalankan scheduler; dedupe_key unik per slot membuat hanya satu submit yang berhasil
+    slot = int(time.time() // interval_seconds)
+    return job_runner.submit("archive", {}, created_by="scheduler", dedupe_key=f"archive:{slot}")
+
+async def schedule_archive_jobs():
+    """Background task: submit job `archive` ke job runner setiap ARCHIVE_INTERVAL_HOURS."""
+    interval = float(os.getenv("ARCHIVE_INTERVAL_HOURS", 24)) * 3600
+    # Cek lebih sering dari interval agar jadwal tetap jalan jika worker yang biasa submit berhenti
+    check_every = min(interval, 3600)
+    while True:
+        try:
+            result = await asyncio.to_thread(submit_scheduled_archive, interval)
+            if result["success"]:
+                logger.info("Archive job submitted", extra={"job_id": result["data"]["id"]})
+        except Exception:
+            logger.exception("Scheduling archive job failed")
+        await asyncio.sleep(check_every)
+
+def run_archive_job(ctx, params: dict) -> dict:
+    """Job `archive`: mengarsipkan setiap collection secara berurutan dengan laporan progres."""
+    service = get_archive_service()
+    sources = params.get("collections") or list(ARCHIVE_COLLECTIONS)
+    results = {}
+    for index, source in enumerate(sources):
+        ctx.check_cancelled()
+        ctx.report_progress(index, len(sources), f"Archiving {source}")
+        results[source] = service.archive_collection(source)
+    ctx.report_progress(len(sources), len(sources), "Completed")
+    return results
+
+job_runner.register("archive", run_archive_job, concurrency=1)
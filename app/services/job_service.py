@@ -0,0 +1,326 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.config.database import MongoDB
+from app.utils.metrics import register_metrics
+from app.utils.response import create_response
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    """Dilempar oleh `JobContext.check_cancelled()` saat job diminta berhenti."""
+
+
+class JobContext:
+    """Diberikan ke fungsi job untuk melaporkan progres dan memeriksa permintaan cancel."""
+
+    def __init__(self, runner: "JobRunner", job_id: ObjectId, params: dict):
+        self.runner = runner
+        self.job_id = job_id
+        self.params = params
+        self.cancel_requested = False
+        self.progress = {"current": 0, "total": None, "message": None}
+
+    def report_progress(self, current: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        # Disimpan ke database oleh heartbeat loop, bukan di setiap panggilan
+        self.progress = {"current": current, "total": total, "message": message}
+
+    def check_cancelled(self) -> None:
+        if self.cancel_requested:
+            raise JobCancelled()
+
+
+class JobType:
+    def __init__(self, name: str, func: Callable, concurrency: int, max_attempts: int):
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.is_async = asyncio.iscoroutinefunction(func)
+
+
+class JobRunner:
+    """
+    Menjalankan job jangka panjang di dalam proses aplikasi, tanpa broker eksternal.
+    Job disimpan di collection `jobs`; worker mengklaim job `queued` secara atomik,
+    membatasi concurrency per tipe job, dan mengirim heartbeat. Job `running` yang heartbeat-nya
+    berhenti (proses crash/restart) dikembalikan ke antrean atau ditandai gagal.
+    """
+
+    def __init__(self):
+        self.job_types: Dict[str, JobType] = {}
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self.poll_interval = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", 2))
+        self.heartbeat_interval = float(os.getenv("JOB_HEARTBEAT_SECONDS", 5))
+        self.stale_after = timedelta(seconds=self.heartbeat_interval * 6)
+        self._collection = None
+        self._running: Dict[ObjectId, JobContext] = {}
+        self._running_by_type: Dict[str, int] = {}
+        self._tasks = []
+        self._job_tasks = set()
+        self._wakeup = None
+        self._last_recovery = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = MongoDB.get_database()["jobs"]
+            self._collection.create_index([("status", 1), ("type", 1), ("created_at", 1)])
+            self._collection.create_index([("status", 1), ("heartbeat_at", 1)])
+            # Job terjadwal memakai dedupe_key per slot waktu; index unik membuat submit dari banyak worker atomik
+            self._collection.create_index(
+                [("dedupe_key", 1)],
+                unique=True,
+                partialFilterExpression={"dedupe_key": {"$exists": True}}
+            )
+        return self._collection
+
+    def register(self, name: str, func: Callable, concurrency: int = 1, max_attempts: int = 3) -> None:
+        """Mendaftarkan tipe job. `func(ctx, params)` boleh sync (dijalankan di thread) atau async."""
+        self.job_types[name] = JobType(name, func, concurrency, max_attempts)
+
+    # --- API untuk controller ---
+    def submit(self, job_type: str, params: dict, created_by: Optional[str] = None, dedupe_key: Optional[str] = None) -> dict:
+        if job_type not in self.job_types:
+            return create_response(False, f"Unknown job type '{job_type}'", None, "UNKNOWN_JOB_TYPE")
+
+        now = datetime.now(timezone.utc)
+        job = {
+            "type": job_type,
+            "params": params,
+            "status": "queued",
+            "progress": {"current": 0, "total": None, "message": None},
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "cancel_requested": False,
+            "created_by": created_by,
+            "created_at": now,
+            "updated_at": now
+        }
+        if dedupe_key is not None:
+            job["dedupe_key"] = dedupe_key
+        try:
+            result = self.collection.insert_one(job)
+        except DuplicateKeyError:
+            return create_response(False, "A job with this key has already been submitted", None, "DUPLICATE_JOB")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return create_response(True, "Job submitted successfully", self._serialize(self.collection.find_one({"_id": result.inserted_id})))
+
+    def get_job(self, job_id: str) -> dict:
+        try:
+            job = self.collection.find_one({"_id": ObjectId(job_id)})
+        except InvalidId:
+            return create_response(False, "Invalid job ID format", None, "INVALID_ID")
+        if not job:
+            return create_response(False, "Job not found", None, "NOT_FOUND")
+        return create_response(True, "Job found", self._serialize(job))
+
+    def list_jobs(self, skip: int = 0, limit: int = 10, status: str = None, job_type: str = None) -> dict:
+        query = {}
+        if status:
+            query["status"] = status
+        if job_type:
+            query["type"] = job_type
+        jobs = [self._serialize(job) for job in self.collection.find(query).sort("created_at", -1).skip(skip).limit(limit)]
+        data = {
+            "items": jobs,
+            "total": self.collection.count_documents(query),
+            "page": (skip // limit) + 1,
+            "size": limit
+        }
+        return create_response(True, "Jobs retrieved successfully", data)
+
+    def cancel(self, job_id: str) -> dict:
+        try:
+            obj_id = ObjectId(job_id)
+        except InvalidId:
+            return create_response(False, "Invalid job ID format", None, "INVALID_ID")
+
+        now = datetime.now(timezone.utc)
+        # Job yang belum berjalan langsung dibatalkan
+        job = self.collection.find_one_and_update(
+            {"_id": obj_id, "status": "queued"},
+            {"$set": {"status": "cancelled", "cancel_requested": True, "finished_at": now, "updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is None:
+            # Job yang sedang berjalan diberi tanda; worker berhenti pada check_cancelled() berikutnya
+            job = self.collection.find_one_and_update(
+                {"_id": obj_id, "status": "running"},
+                {"$set": {"cancel_requested": True, "updated_at": now}},
+                return_document=ReturnDocument.AFTER
+            )
+            if job is not None and obj_id in self._running:
+                self._running[obj_id].cancel_requested = True
+        if job is None:
+            if self.collection.find_one({"_id": obj_id}, {"_id": 1}) is None:
+                return create_response(False, "Job not found", None, "NOT_FOUND")
+            return create_response(False, "Job has already finished", None, "JOB_FINISHED")
+        return create_response(True, "Job cancellation requested", self._serialize(job))
+
+    @staticmethod
+    def _serialize(job: dict) -> dict:
+        job["id"] = str(job.pop("_id"))
+        return job
+
+    # --- Worker ---
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self._recover_stale_jobs)
+        self._last_recovery = datetime.now(timezone.utc)
+        self._tasks = [
+            asyncio.create_task(self._poll_loop()),
+            asyncio.create_task(self._heartbeat_loop())
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        # Job yang terhenti karena shutdown dikembalikan ke antrean untuk dilanjutkan setelah restart
+        if self._running:
+            await asyncio.to_thread(
+                self.collection.update_many,
+                {"_id": {"$in": list(self._running)}, "status": "running", "worker_id": self.worker_id},
+                {"$set": {"status": "queued", "worker_id": None, "updated_at": datetime.now(timezone.utc)}}
+            )
+
+    def _recover_stale_jobs(self) -> None:
+        cutoff = datetime.now(timezone.utc) - self.stale_after
+        for job in self.collection.find({"status": "running", "heartbeat_at": {"$lt": cutoff}}):
+            job_type = self.job_types.get(job["type"])
+            max_attempts = job_type.max_attempts if job_type else 1
+            if job["attempts"] < max_attempts and not job.get("cancel_requested"):
+                update = {"status": "queued", "worker_id": None}
+            else:
+                update = {
+                    "status": "cancelled" if job.get("cancel_requested") else "failed",
+                    "error": job.get("error") or "Worker stopped while the job was running",
+                    "finished_at": datetime.now(timezone.utc)
+                }
+            self.collection.update_one(
+                {"_id": job["_id"], "status": "running", "heartbeat_at": job["heartbeat_at"]},
+                {"$set": {**update, "updated_at": datetime.now(timezone.utc)}}
+            )
+            logger.warning("Recovered stale job", extra={"job_id": str(job["_id"]), "job_type": job["type"], "new_status": update["status"]})
+
+    def _claim_next(self) -> Optional[dict]:
+        available = [
+            name for name, job_type in self.job_types.items()
+            if self._running_by_type.get(name, 0) < job_type.concurrency
+        ]
+        if not available:
+            return None
+        now = datetime.now(timezone.utc)
+        return self.collection.find_one_and_update(
+            {"status": "queued", "type": {"$in": available}},
+            {
+                "$set": {"status": "running", "worker_id": self.worker_id, "started_at": now, "heartbeat_at": now, "updated_at": now},
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                while True:
+                    job = await asyncio.to_thread(self._claim_next)
+                    if job is None:
+                        break
+                    self._launch(job)
+                # Periksa berkala job milik worker lain yang berhenti mengirim heartbeat
+                if datetime.now(timezone.utc) - self._last_recovery > self.stale_after:
+                    await asyncio.to_thread(self._recover_stale_jobs)
+                    self._last_recovery = datetime.now(timezone.utc)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job poll failed")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _launch(self, job: dict) -> None:
+        job_type = self.job_types[job["type"]]
+        ctx = JobContext(self, job["_id"], job.get("params") or {})
+        self._running[job["_id"]] = ctx
+        self._running_by_type[job_type.name] = self._running_by_type.get(job_type.name, 0) + 1
+        task = asyncio.create_task(self._run(job_type, ctx))
+        self._job_tasks.add(task)
+        task.add_done_callback(self._job_tasks.discard)
+
+    async def _run(self, job_type: JobType, ctx: JobContext) -> None:
+        update: Dict[str, Any]
+        try:
+            if job_type.is_async:
+                result = await job_type.func(ctx, ctx.params)
+            else:
+                result = await asyncio.to_thread(job_type.func, ctx, ctx.params)
+            update = {"status": "succeeded", "result": result}
+        except JobCancelled:
+            update = {"status": "cancelled"}
+        except Exception as e:
+            logger.exception("Job failed", extra={"job_id": str(ctx.job_id), "job_type": job_type.name})
+            update = {"status": "failed", "error": str(e)}
+        finally:
+            self._running.pop(ctx.job_id, None)
+            self._running_by_type[job_type.name] -= 1
+
+        now = datetime.now(timezone.utc)
+        await asyncio.to_thread(
+            self.collection.update_one,
+            {"_id": ctx.job_id, "worker_id": self.worker_id},
+            {"$set": {**update, "progress": ctx.progress, "finished_at": now, "updated_at": now}}
+        )
+        self._wakeup.set()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self._heartbeat)
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+    def _heartbeat(self) -> None:
+        now = datetime.now(timezone.utc)
+        for job_id, ctx in list(self._running.items()):
+            job = self.collection.find_one_and_update(
+                {"_id": job_id, "worker_id": self.worker_id},
+                {"$set": {"heartbeat_at": now, "progress": ctx.progress, "updated_at": now}},
+                projection={"cancel_requested": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if job and job.get("cancel_requested"):
+                ctx.cancel_requested = True
+
+    def get_metrics(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "running": dict(self._running_by_type),
+            "concurrency": {name: job_type.concurrency for name, job_type in self.job_types.items()}
+        }
+
+
+job_runner = JobRunner()
+register_metrics("jobs", job_runner.get_metrics)
@@ -1,12 +1,24 @@
-from pymongo.errors import DuplicateKeyError
-from pymongo import ReturnDocument
+import base64
+import json
+import os
+import re
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from pymongo import ReturnDocument, UpdateOne
 from bson import ObjectId
 from bson.errors import InvalidId
-from datetime import datetime, timezone
+from bson import json_util
+from datetime import datetime, timedelta, timezone
 from app.config.database import MongoDB
 # Pastikan StudentResponse juga diimpor untuk digunakan di service
-from app.models.student_model import Student, StudentUpdate, StudentResponse
+from app.models.student_model import Student, StudentUpdate, StudentResponse, StudentBulkUpdate, StudentBulkDelete
 from app.utils.response import create_response
+from app.utils.write_batcher import InsertBatcher
+from app.utils.metrics import register_metrics
+from app.utils.causal_session import causal_sessions
+from app.utils.result_cache import list_cache
+from app.utils.fieldsets import build_projection, get_partial_model
+from app.services.user_summary_service import get_user_summaries
+from app.services.typeahead_service import typeahead_service
 
 class StudentService:
     """Service layer for student-related operations."""
@@ -16,16 +28,60 @@ class StudentService:
         self.db = MongoDB.get_database()
         self.collection = self.db["students"]
         self.collection.create_index([("nim", 1)], unique=True, partialFilterExpression={"is_deleted": False})
+        # Index untuk change feed (delta sync) yang diurutkan berdasarkan (updated_at, _id)
+        self.collection.create_index([("updated_at", 1), ("_id", 1)])
 
-    def create_student(self, student: Student):
+        # Opsional: gabungkan create yang bersamaan menjadi satu insert_many
+        self.create_batcher = None
+        if os.getenv("STUDENT_CREATE_BATCHING", "false").lower() == "true":
+            self.create_batcher = InsertBatcher(
+                MongoDB.get_collection("students", "students.create"),
+                max_batch_size=int(os.getenv("STUDENT_CREATE_BATCH_SIZE", 100)),
+                max_wait_ms=float(os.getenv("STUDENT_CREATE_BATCH_WAIT_MS", 5))
+            )
+            register_metrics("student_create_batching", self.create_batcher.get_metrics)
+
+        # Auto-merge update (opt-in per request lewat ?merge=true)
+        self.field_history_size = int(os.getenv("STUDENT_FIELD_HISTORY_SIZE", 20))
+        self.merge_max_retries = int(os.getenv("STUDENT_MERGE_MAX_RETRIES", 3))
+
+    def _prepare_student_document(self, student: Student) -> dict:
+        student_dict = student.model_dump()
+        # updated_at selalu terisi agar dokumen baru ikut terbaca oleh change feed
+        if student_dict.get("updated_at") is None:
+            student_dict["updated_at"] = student_dict["created_at"]
+        return student_dict
+
+    async def create_student_async(self, student: Student, actor_id: str = None):
+        """Creates a student through the insert batcher when enabled, otherwise falls back to create_student."""
+        if self.create_batcher is None:
+            return self.create_student(student, actor_id)
+
+        student_dict = self._prepare_student_document(student)
+        try:
+            await self.create_batcher.insert(student_dict)
+        except DuplicateKeyError:
+            return create_response(False, "Student with this NIM already exists", None, "DUPLICATE_NIM")
+        list_cache.bump("students")
+        typeahead_service.upsert(str(student_dict["_id"]), student_dict["nim"], student_dict["name"])
+
+        # Dokumen sudah berisi `_id`, sehingga tidak perlu find_one tambahan
+        response_data = StudentResponse.model_validate(student_dict)
+        return create_response(True, "Student created successfully", response_data.model_dump())
+
+    def create_student(self, student: Student, actor_id: str = None):
         """Creates a new student in the database."""
         try:
-            student_dict = student.model_dump()
-            result = self.collection.insert_one(student_dict)
-            created_student_doc = self.collection.find_one({"_id": result.inserted_id})
+            student_dict = self._prepare_student_document(student)
+            collection = MongoDB.get_collection("students", "students.create")
+            with causal_sessions.write_session(actor_id) as session:
+                result = collection.insert_one(student_dict, session=session)
+                created_student_doc = collection.find_one({"_id": result.inserted_id}, session=session)
+            list_cache.bump("students")
             
             # ✅ Konsisten: Gunakan model Pydantic untuk memvalidasi dan membentuk respons
             if created_student_doc:
+                typeahead_service.upsert(str(created_student_doc["_id"]), created_student_doc["nim"], created_student_doc["name"])
                 response_data = StudentResponse.model_validate(created_student_doc)
                 return create_response(True, "Student created successfully", response_data.model_dump())
             
@@ -35,34 +91,72 @@ class StudentService:
         except DuplicateKeyError:
             return create_response(False, "Student with this NIM already exists", None, "DUPLICATE_NIM")
 
-    def get_student_by_id(self, student_id: str):
-        """Retrieves a single student by their ID."""
+    @staticmethod
+    def _response_model(fields: tuple = None):
+        # Model parsial (di-cache per kombinasi field) agar validasi hanya untuk field yang diminta
+        return get_partial_model(StudentResponse, fields) if fields else StudentResponse
+
+    @staticmethod
+    def _expand(items: list, expand: tuple) -> None:
+        if "created_by" in expand:
+            # Satu query $in (atau nol jika semua ada di cache) untuk seluruh halaman
+            summaries = get_user_summaries(item.get("created_by") for item in items)
+            for item in items:
+                item["created_by_user"] = summaries.get(item.get("created_by"))
+
+    def suggest_students(self, query: str, limit: int = 10):
+        """Autocomplete on name and NIM prefixes, served from the in-memory index once it is built."""
+        if typeahead_service.ready:
+            items = typeahead_service.search(query, limit)
+        else:
+            # Fallback saat startup: regex prefix langsung ke database
+            pattern = "^" + re.escape(query.strip())
+            cursor = MongoDB.get_collection("students", "students.get_all").find(
+                {"is_deleted": False, "$or": [{"nim": {"$regex": pattern}}, {"name": {"$regex": pattern, "$options": "i"}}]},
+                {"nim": 1, "name": 1}
+            ).limit(limit)
+            items = [{"id": str(doc["_id"]), "nim": doc["nim"], "name": doc["name"]} for doc in cursor]
+        return create_response(True, "Suggestions retrieved successfully", {"items": items})
+
+    def get_student_by_id(self, student_id: str, actor_id: str = None, fields: tuple = None, expand: tuple = ()):
+        """Retrieves a single student by their ID, optionally projected to `fields`."""
         try:
             obj_id = ObjectId(student_id)
-            student_doc = self.collection.find_one({"_id": obj_id, "is_deleted": False})
+            collection = MongoDB.get_collection("students", "students.get_by_id")
+            with causal_sessions.read_session(actor_id) as session:
+                student_doc = collection.find_one(
+                    {"_id": obj_id, "is_deleted": False}, build_projection(fields), session=session
+                )
             
             if student_doc:
                 # ✅ Konsisten: Gunakan model Pydantic, ini akan menangani _id -> id
-                response_data = StudentResponse.model_validate(student_doc)
-                return create_response(True, "Student found", response_data.model_dump())
+                response_data = self._response_model(fields).model_validate(student_doc).model_dump()
+                self._expand([response_data], expand)
+                return create_response(True, "Student found", response_data)
             
             return create_response(False, "Student not found", None, "NOT_FOUND")
         
         except InvalidId:
             return create_response(False, "Invalid student ID format", None, "INVALID_ID")
 
-    def get_all_students(self, skip: int = 0, limit: int = 10, filters: dict = None):
-        """Retrieves a paginated list of students."""
+    def get_all_students(self, skip: int = 0, limit: int = 10, filters: dict = None, actor_id: str = None, fields: tuple = None, expand: tuple = ()):
+        """Retrieves a paginated list of students, optionally projected to `fields`."""
         query = {"is_deleted": False}
         if filters:
             query.update({k: v for k, v in filters.items() if k != "is_deleted"})
         
-        cursor = self.collection.find(query).skip(skip).limit(limit)
-        
-        # ✅ Konsisten: Gunakan list comprehension dan model Pydantic untuk transformasi
-        student_list = [StudentResponse.model_validate(doc).model_dump() for doc in cursor]
-        
-        total = self.collection.count_documents(query)
+        collection = MongoDB.get_collection("students", "students.get_all")
+        # Read dari secondary; causal session hanya dipakai jika pemanggil baru saja melakukan write
+        with causal_sessions.read_session(actor_id) as session:
+            cursor = collection.find(query, build_projection(fields), session=session).skip(skip).limit(limit)
+            
+            # ✅ Konsisten: Gunakan list comprehension dan model Pydantic untuk transformasi
+            response_model = self._response_model(fields)
+            student_list = [response_model.model_validate(doc).model_dump() for doc in cursor]
+            
+            total = collection.count_documents(query, session=session)
+
+        self._expand(student_list, expand)
         
         data = {
             "items": student_list,
@@ -73,8 +167,12 @@ class StudentService:
         return create_response(True, "Students retrieved successfully", data)
 
     # ✅ PERBAIKAN UTAMA: Indentasi seluruh fungsi ini
-    def update_student(self, student_id: str, student_data: StudentUpdate):
-        """Updates an existing student's data using an atomic operation."""
+    def update_student(self, student_id: str, student_data: StudentUpdate, actor_id: str = None, merge: bool = False):
+        """
+        Updates an existing student's data using an atomic operation.
+        With `merge`, a stale version is retried against the latest one as long as the fields
+        changed in between do not overlap with this update.
+        """
         try:
             obj_id = ObjectId(student_id)
             
@@ -87,16 +185,38 @@ class StudentService:
             if client_version is None:
                 return create_response(False, "Version number is required for updates", None, "VERSION_REQUIRED")
             
-            updated_student_doc = self.collection.find_one_and_update(
-                {"_id": obj_id, "is_deleted": False, "version": client_version},
-                {
-                    "$set": {**update_fields, "updated_at": datetime.now(timezone.utc)},
-                    "$inc": {"version": 1}
-                },
-                return_document=ReturnDocument.AFTER 
-            )
+            collection = MongoDB.get_collection("students", "students.update")
+            expected_version = client_version
+            with causal_sessions.write_session(actor_id) as session:
+                for _ in range(self.merge_max_retries + 1):
+                    updated_student_doc = collection.find_one_and_update(
+                        {"_id": obj_id, "is_deleted": False, "version": expected_version},
+                        self._versioned_update(update_fields, expected_version + 1),
+                        return_document=ReturnDocument.AFTER,
+                        session=session
+                    )
+                    if updated_student_doc or not merge:
+                        break
+
+                    current = collection.find_one({"_id": obj_id, "is_deleted": False}, session=session)
+                    if not current:
+                        break
+                    conflicts = self._find_conflicts(current, update_fields, client_version)
+                    if conflicts is None:
+                        return create_response(False, "Update failed due to version conflict", None, "VERSION_CONFLICT")
+                    if conflicts:
+                        return create_response(
+                            False,
+                            "Update conflicts with concurrent changes",
+                            {"conflicts": conflicts, "version": current["version"]},
+                            "VERSION_CONFLICT"
+                        )
+                    expected_version = current["version"]
+            list_cache.bump("students")
             
             if updated_student_doc:
+                if "name" in update_fields:
+                    typeahead_service.upsert(student_id, updated_student_doc["nim"], updated_student_doc["name"])
                 response_data = StudentResponse.model_validate(updated_student_doc)
                 return create_response(True, "Student updated successfully", response_data.model_dump())
             
@@ -109,31 +229,308 @@ class StudentService:
         except InvalidId:
             return create_response(False, "Invalid student ID format", None, "INVALID_ID")
 
-    def soft_delete_student(self, student_id: str):
+    def _versioned_update(self, update_fields: dict, new_version: int) -> dict:
+        # Riwayat ringkas: field apa saja yang berubah di tiap versi, dibatasi N entry terakhir
+        return {
+            "$set": {**update_fields, "updated_at": datetime.now(timezone.utc)},
+            "$inc": {"version": 1},
+            "$push": {
+                "field_history": {
+                    "$each": [{"v": new_version, "f": sorted(update_fields)}],
+                    "$slice": -self.field_history_size
+                }
+            }
+        }
+
+    @staticmethod
+    def _find_conflicts(current: dict, update_fields: dict, base_version: int):
+        """
+        Mengembalikan field yang benar-benar konflik beserta nilai terbarunya ({} jika bisa di-merge),
+        atau None jika riwayat tidak lengkap (mis. perubahan lewat bulk update atau restore)
+        sehingga konflik tidak bisa dipastikan.
+        """
+        if base_version > current["version"]:
+            return None
+        history = {entry["v"]: entry["f"] for entry in current.get("field_history", [])}
+        changed = set()
+        for version in range(base_version + 1, current["version"] + 1):
+            if version not in history:
+                return None
+            changed.update(history[version])
+        # Field yang diubah ke nilai yang sama tidak dianggap konflik
+        return {
+            field: current.get(field)
+            for field, value in update_fields.items()
+            if field in changed and current.get(field) != value
+        }
+
+    def soft_delete_student(self, student_id: str, actor_id: str = None):
         """Soft deletes a student by setting 'is_deleted' to True."""
         try:
             obj_id = ObjectId(student_id)
             
-            result = self.collection.update_one(
-                {"_id": obj_id, "is_deleted": False},
-                {
-                    "$set": {
-                        "is_deleted": True,
-                        "deleted_at": datetime.now(timezone.utc),
-                        "updated_at": datetime.now(timezone.utc)
+            collection = MongoDB.get_collection("students", "students.soft_delete")
+            with causal_sessions.write_session(actor_id) as session:
+                result = collection.update_one(
+                    {"_id": obj_id, "is_deleted": False},
+                    {
+                        "$set": {
+                            "is_deleted": True,
+                            "deleted_at": datetime.now(timezone.utc),
+                            "updated_at": datetime.now(timezone.utc)
+                        },
+                        "$inc": {"version": 1}
                     },
-                    "$inc": {"version": 1}
-                }
-            )
+                    session=session
+                )
+            list_cache.bump("students")
             
             if result.modified_count == 0:
                 return create_response(False, "Student not found or already deleted", None, "NOT_FOUND")
             
+            typeahead_service.remove(student_id)
             return create_response(True, "Student deleted successfully", None)
         
         except InvalidId:
             return create_response(False, "Invalid student ID format", None, "INVALID_ID")
 
+    def get_student_changes(self, since: datetime = None, cursor: str = None, limit: int = 100):
+        """
+        Returns students (including tombstones) changed after a watermark, ordered by (updated_at, _id).
+        The returned `next_cursor` resumes exactly after the last returned document.
+        """
+        # Abaikan perubahan yang terlalu baru agar write yang masih in-flight tidak terlewat
+        upper_bound = datetime.now(timezone.utc) - timedelta(seconds=float(os.getenv("CHANGE_FEED_SAFETY_LAG_SECONDS", 1)))
+        query = {"updated_at": {"$lt": upper_bound}}
+
+        if cursor:
+            try:
+                position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+                last_updated_at = datetime.fromisoformat(position["t"])
+                last_id = ObjectId(position["id"])
+            except (ValueError, KeyError, TypeError, InvalidId):
+                return create_response(False, "Invalid change feed cursor", None, "INVALID_CURSOR")
+            query["$or"] = [
+                {"updated_at": {"$gt": last_updated_at}},
+                {"updated_at": last_updated_at, "_id": {"$gt": last_id}}
+            ]
+        elif since:
+            query["updated_at"]["$gt"] = since
+
+        collection = MongoDB.get_collection("students", "students.changes")
+        docs = list(collection.find(query).sort([("updated_at", 1), ("_id", 1)]).limit(limit))
+        items = [self._serialize_change(doc) for doc in docs]
+
+        next_cursor = cursor
+        if docs:
+            last = docs[-1]
+            last_updated_at = last["updated_at"]
+            if last_updated_at.tzinfo is None:
+                last_updated_at = last_updated_at.replace(tzinfo=timezone.utc)
+            position = {"t": last_updated_at.isoformat(), "id": str(last["_id"])}
+            next_cursor = base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+        data = {
+            "items": items,
+            "next_cursor": next_cursor,
+            "has_more": len(docs) == limit
+        }
+        return create_response(True, "Student changes retrieved successfully", data)
+
+    def get_student_changes_from_stream(self, cursor: str = None, limit: int = 100, max_await_ms: int = 100):
+        """
+        Reads the change feed from a MongoDB change stream (replica set only).
+        Blocks for up to `max_await_ms` while waiting for events, so call it off the event loop.
+        The cursor is the change stream resume token, or the cluster time the feed started at
+        when no event has been seen yet.
+        """
+        resume_after = start_at = None
+        if cursor:
+            try:
+                position = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            except (ValueError, TypeError):
+                return create_response(False, "Invalid change feed cursor", None, "INVALID_CURSOR")
+            if isinstance(position, dict) and "start_at" in position:
+                start_at = position["start_at"]
+            else:
+                resume_after = position
+        else:
+            # Tanpa cursor: mulai dari waktu cluster saat ini agar respons pertama selalu membawa posisi lanjutan
+            start_at = self.db.command("ping").get("operationTime")
+
+        try:
+            items = []
+            with self.collection.watch(
+                full_document="updateLookup",
+                resume_after=resume_after,
+                start_at_operation_time=start_at,
+                max_await_time_ms=max_await_ms
+            ) as stream:
+                while len(items) < limit:
+                    event = stream.try_next()
+                    if event is None:
+                        break
+                    document = event.get("fullDocument")
+                    if document is not None:
+                        items.append(self._serialize_change(document))
+                    elif event["operationType"] == "delete":
+                        items.append({"id": str(event["documentKey"]["_id"]), "is_deleted": True, "purged": True})
+                resume_token = stream.resume_token
+        except OperationFailure as e:
+            if e.timeout:
+                raise
+            return create_response(False, f"Change streams are not available: {e}", None, "CHANGE_STREAM_UNAVAILABLE")
+
+        if resume_token:
+            next_cursor = base64.urlsafe_b64encode(json_util.dumps(resume_token).encode("utf-8")).decode("ascii")
+        elif start_at is not None:
+            next_cursor = base64.urlsafe_b64encode(json_util.dumps({"start_at": start_at}).encode("utf-8")).decode("ascii")
+        else:
+            next_cursor = cursor
+        data = {
+            "items": items,
+            "next_cursor": next_cursor,
+            "has_more": len(items) == limit
+        }
+        return create_response(True, "Student changes retrieved successfully", data)
+
+    @staticmethod
+    def _serialize_change(doc: dict) -> dict:
+        if doc.get("is_deleted"):
+            # Tombstone: cukup identitas dan metadata penghapusan
+            return {
+                "id": str(doc["_id"]),
+                "nim": doc.get("nim"),
+                "guid": doc.get("guid"),
+                "version": doc.get("version"),
+                "updated_at": doc.get("updated_at"),
+                "deleted_at": doc.get("deleted_at"),
+                "is_deleted": True
+            }
+        return {**StudentResponse.model_validate(doc).model_dump(), "is_deleted": False}
+
+    def bulk_update_students(self, payload: StudentBulkUpdate):
+        """Updates many students at once, by ID list or by filter, bumping each document's version."""
+        now = self._bulk_timestamp()
+        set_fields = payload.model_dump(include={"study_program", "semester", "gpa"}, exclude_none=True)
+        update = {"$set": {**set_fields, "updated_at": now}, "$inc": {"version": 1}}
+        extra_filter = {}
+        if payload.semester_increment:
+            update["$inc"]["semester"] = payload.semester_increment
+            # Jaga agar semester hasil increment tetap dalam rentang 1-14
+            extra_filter["semester"] = {"$gte": 1 - payload.semester_increment, "$lte": 14 - payload.semester_increment}
+
+        return self._run_bulk(payload, update, extra_filter, now, "Students updated successfully")
+
+    def bulk_soft_delete_students(self, payload: StudentBulkDelete):
+        """Soft deletes many students at once, by ID list or by filter."""
+        now = self._bulk_timestamp()
+        update = {
+            "$set": {"is_deleted": True, "deleted_at": now, "updated_at": now},
+            "$inc": {"version": 1}
+        }
+        return self._run_bulk(payload, update, {}, now, "Students deleted successfully")
+
+    @staticmethod
+    def _bulk_timestamp() -> datetime:
+        # BSON menyimpan datetime dengan presisi milidetik; potong agar bisa dibandingkan setelah ditulis
+        now = datetime.now(timezone.utc)
+        return now.replace(microsecond=(now.microsecond // 1000) * 1000)
+
+    @staticmethod
+    def _combine_filters(*conditions: dict) -> dict:
+        """
+        Menggabungkan beberapa kondisi query. Field yang muncul di lebih dari satu kondisi
+        (mis. `semester` dari klien dan batas rentang semester_increment) digabung dengan $and,
+        bukan saling menimpa.
+        """
+        merged, overlapping = {}, []
+        for condition in conditions:
+            for key, value in condition.items():
+                if key in merged:
+                    overlapping.append({key: value})
+                else:
+                    merged[key] = value
+        if overlapping:
+            merged["$and"] = overlapping
+        return merged
+
+    def _run_bulk(self, payload, update: dict, extra_filter: dict, now: datetime, message: str):
+        if payload.filter is not None:
+            query = self._combine_filters(payload.filter.model_dump(exclude_none=True), extra_filter, {"is_deleted": False})
+            result = MongoDB.get_collection("students", "students.bulk").update_many(query, update)
+            list_cache.bump("students")
+            data = {
+                "matched": result.matched_count,
+                "modified": result.modified_count,
+                "conflicts": [],
+                "not_found": [],
+                "invalid_ids": []
+            }
+            return create_response(True, message, data)
+
+        expected_versions = payload.expected_versions or {}
+        obj_ids, invalid_ids = [], []
+        for student_id in dict.fromkeys(payload.ids):
+            try:
+                obj_ids.append(ObjectId(student_id))
+            except InvalidId:
+                invalid_ids.append(student_id)
+
+        operations = []
+        for obj_id in obj_ids:
+            query = self._combine_filters({"_id": obj_id, "is_deleted": False}, extra_filter)
+            if str(obj_id) in expected_versions:
+                query["version"] = expected_versions[str(obj_id)]
+            operations.append(UpdateOne(query, update))
+
+        matched = modified = 0
+        if operations:
+            result = MongoDB.get_collection("students", "students.bulk").bulk_write(operations, ordered=False)
+            list_cache.bump("students")
+            matched, modified = result.matched_count, result.modified_count
+
+        conflicts, not_found = [], []
+        if matched < len(obj_ids):
+            conflicts, not_found = self._classify_bulk_misses(obj_ids, expected_versions, now)
+
+        data = {
+            "matched": matched,
+            "modified": modified,
+            "conflicts": conflicts,
+            "not_found": not_found,
+            "invalid_ids": invalid_ids
+        }
+        return create_response(True, message, data)
+
+    def _classify_bulk_misses(self, obj_ids: list, expected_versions: dict, now: datetime):
+        """Determines why documents in an ID-based bulk operation were not modified."""
+        docs = {
+            doc["_id"]: doc
+            for doc in self.collection.find(
+                {"_id": {"$in": obj_ids}},
+                {"version": 1, "is_deleted": 1, "updated_at": 1, "semester": 1}
+            )
+        }
+        conflicts, not_found = [], []
+        for obj_id in obj_ids:
+            doc = docs.get(obj_id)
+            updated_at = doc.get("updated_at") if doc else None
+            if updated_at is not None and updated_at.replace(tzinfo=None) == now.replace(tzinfo=None):
+                continue  # Dokumen ini diubah oleh operasi bulk ini
+            if not doc or doc.get("is_deleted"):
+                not_found.append(str(obj_id))
+                continue
+
+            expected = expected_versions.get(str(obj_id))
+            conflicts.append({
+                "id": str(obj_id),
+                "error": "VERSION_CONFLICT" if expected is not None and doc["version"] != expected else "CONSTRAINT_VIOLATION",
+                "expected_version": expected,
+                "current_version": doc["version"]
+            })
+        return conflicts, not_found
+
 # from app.config.database import MongoDB
 # from app.models.student_model import Student, StudentResponse, StudentUpdate
 # from app.utils.response import create_response
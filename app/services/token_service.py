@@ -0,0 +1,83 @@
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from pymongo import ReturnDocument
+
+from app.config.database import MongoDB
+
+class RefreshTokenService:
+    """
+    Menyimpan refresh token dalam bentuk hash (SHA-256) di collection `refresh_tokens`.
+    Setiap refresh merotasi token; token yang dipakai ulang akan mencabut seluruh family-nya.
+    """
+
+    def __init__(self):
+        self.collection = MongoDB.get_database()["refresh_tokens"]
+        self.collection.create_index([("token_hash", 1)], unique=True)
+        self.collection.create_index([("family_id", 1)])
+        self.collection.create_index([("user_id", 1)])
+        # Dokumen yang sudah kedaluwarsa dihapus otomatis oleh MongoDB
+        self.collection.create_index([("expires_at", 1)], expireAfterSeconds=0)
+
+    @staticmethod
+    def _hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def issue(self, user_id: str, family_id: str = None) -> str:
+        """Membuat refresh token baru dan mengembalikan nilai plaintext-nya (hanya sekali)."""
+        token = secrets.token_urlsafe(48)
+        now = datetime.now(timezone.utc)
+        self.collection.insert_one({
+            "token_hash": self._hash_token(token),
+            "user_id": user_id,
+            "family_id": family_id or str(uuid4()),
+            "revoked": False,
+            "created_at": now,
+            "expires_at": now + timedelta(days=int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7)))
+        })
+        return token
+
+    def rotate(self, token: str):
+        """
+        Menandai refresh token sebagai terpakai dan menerbitkan penggantinya.
+        Mengembalikan tuple (user_id, refresh_token_baru), atau None jika token tidak valid.
+        """
+        token_hash = self._hash_token(token)
+        now = datetime.now(timezone.utc)
+        stored = self.collection.find_one_and_update(
+            {"token_hash": token_hash, "revoked": False, "expires_at": {"$gt": now}},
+            {"$set": {"revoked": True, "revoked_at": now, "revoked_reason": "rotated"}},
+            return_document=ReturnDocument.BEFORE
+        )
+
+        if not stored:
+            # Token yang sudah dirotasi dipakai lagi: anggap bocor dan cabut seluruh family
+            reused = self.collection.find_one({"token_hash": token_hash, "revoked_reason": "rotated"})
+            if reused:
+                self.revoke_family(reused["family_id"], "reuse_detected")
+            return None
+
+        new_token = self.issue(stored["user_id"], stored["family_id"])
+        return stored["user_id"], new_token
+
+    def revoke(self, token: str) -> bool:
+        stored = self.collection.find_one({"token_hash": self._hash_token(token)})
+        if not stored:
+            return False
+        self.revoke_family(stored["family_id"], "logout")
+        return True
+
+    def revoke_family(self, family_id: str, reason: str) -> None:
+        self.collection.update_many(
+            {"family_id": family_id, "revoked": False},
+            {"$set": {"revoked": True, "revoked_at": datetime.now(timezone.utc), "revoked_reason": reason}}
+        )
+
+    def revoke_user(self, user_id: str, reason: str = "user_revoked") -> None:
+        self.collection.update_many(
+            {"user_id": user_id, "revoked": False},
+            {"$set": {"revoked": True, "revoked_at": datetime.now(timezone.utc), "revoked_reason": reason}}
+        )
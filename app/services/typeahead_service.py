@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from app.config.database import MongoDB
+from app.utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+def normalize(text: str) -> str:
+    """Huruf kecil tanpa diakritik, agar "Andréa" cocok dengan "andrea"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+class _Entry:
+    __slots__ = ("id", "nim", "name")
+
+    def __init__(self, student_id: str, nim: str, name: str):
+        self.id = student_id
+        self.nim = nim
+        self.name = name
+
+    def keys(self) -> List[str]:
+        # Setiap kata pada nama diindeks, sehingga "san" menemukan "Budi Santoso"
+        # Kata nama yang sama (mis. "putra") dipakai bersama antar entry lewat sys.intern
+        return sorted(sys.intern(key) for key in {normalize(self.nim), *normalize(self.name).split()} - {""})
+
+
+class PrefixIndex:
+    """
+    Index prefix in-memory untuk autocomplete nama dan NIM mahasiswa.
+    Key disimpan sebagai list string terurut dengan `array` paralel berisi nomor slot entry,
+    sehingga pencarian prefix cukup satu bisect lalu membaca key berurutan.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._refs = array("I")
+        self._entries: List[Optional[_Entry]] = []
+        self._slots = {}
+        self._free = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, students) -> "PrefixIndex":
+        """Membangun index sekaligus dari iterable (id, nim, name); lebih cepat daripada upsert satu per satu."""
+        index = cls()
+        pairs = []
+        for student_id, nim, name in students:
+            entry = _Entry(student_id, nim, name)
+            slot = len(index._entries)
+            index._entries.append(entry)
+            index._slots[student_id] = slot
+            pairs.extend((key, slot) for key in entry.keys())
+        pairs.sort()
+        index._keys = [key for key, _ in pairs]
+        index._refs = array("I", (slot for _, slot in pairs))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def upsert(self, student_id: str, nim: str, name: str) -> None:
+        with self._lock:
+            self._remove(student_id)
+            entry = _Entry(student_id, nim, name)
+            if self._free:
+                slot = self._free.pop()
+                self._entries[slot] = entry
+            else:
+                slot = len(self._entries)
+                self._entries.append(entry)
+            self._slots[student_id] = slot
+            for key in entry.keys():
+                position = bisect_left(self._keys, key)
+                self._keys.insert(position, key)
+                self._refs.insert(position, slot)
+
+    def remove(self, student_id: str) -> None:
+        with self._lock:
+            self._remove(student_id)
+
+    def _remove(self, student_id: str) -> None:
+        slot = self._slots.pop(student_id, None)
+        if slot is None:
+            return
+        for key in self._entries[slot].keys():
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._refs[position] == slot:
+                    del self._keys[position]
+                    del self._refs[position]
+                    break
+                position += 1
+        self._entries[slot] = None
+        self._free.append(slot)
+
+    def search(self, query: str, limit: int = 10, max_scan: int = 5000) -> List[dict]:
+        """
+        Semua kata pada query harus menjadi prefix dari NIM atau salah satu kata nama.
+        Kandidat diambil dari kata terpanjang (paling selektif), lalu disaring dengan kata lainnya;
+        `max_scan` membatasi jumlah key yang dibaca agar latensi tetap terjaga untuk prefix yang sangat umum.
+        """
+        terms = normalize(query).split()
+        if not terms:
+            return []
+        anchor = max(terms, key=len)
+        others = [t for t in terms if t is not anchor]
+
+        results = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._keys, anchor)
+            end = min(len(self._keys), position + max_scan)
+            while position < end and len(results) < limit:
+                if not self._keys[position].startswith(anchor):
+                    break
+                slot = self._refs[position]
+                position += 1
+                if slot in seen:
+                    continue
+                seen.add(slot)
+                entry = self._entries[slot]
+                if others:
+                    keys = entry.keys()
+                    if not all(any(k.startswith(t) for k in keys) for t in others):
+                        continue
+                results.append({"id": entry.id, "nim": entry.nim, "name": entry.name})
+        return results
+
+    def memory_bytes(self) -> int:
+        """Perkiraan memori (list, array, string key, dan entry); O(n), hanya untuk metrics."""
+        with self._lock:
+            total = sys.getsizeof(self._keys) + sys.getsizeof(self._refs) + sys.getsizeof(self._entries) + sys.getsizeof(self._slots)
+            total += sum(sys.getsizeof(key) for key in {id(k): k for k in self._keys}.values())
+            for entry in self._entries:
+                if entry is not None:
+                    total += sys.getsizeof(entry) + sys.getsizeof(entry.id) + sys.getsizeof(entry.nim) + sys.getsizeof(entry.name)
+            return total
+
+
+class TypeaheadService:
+    """
+    Memegang PrefixIndex mahasiswa: dibangun saat startup, diperbarui langsung oleh StudentService,
+    dan disinkronkan berkala lewat `updated_at` untuk perubahan dari worker lain, bulk update, dan restore.
+    """
+
+    def __init__(self, poll_seconds: float = 5, overlap_seconds: float = 5):
+        self.poll_seconds = poll_seconds
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.index: Optional[PrefixIndex] = None
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._watermark: Optional[datetime] = None
+        self._task = None
+        self.stats = {"queries": 0, "query_time_total_ms": 0.0, "query_time_max_ms": 0.0, "build_ms": None}
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    # --- Dipanggil oleh StudentService ---
+    def upsert(self, student_id: str, nim: str, name: str) -> None:
+        with self._pending_lock:
+            if self.index is None:
+                # Index masih dibangun; perubahan diterapkan setelah build selesai
+                self._pending.append((student_id, nim, name))
+                return
+        self.index.upsert(student_id, nim, name)
+
+    def remove(self, student_id: str) -> None:
+        with self._pending_lock:
+            if self.index is None:
+                self._pending.append((student_id, None, None))
+                return
+        self.index.remove(student_id)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        start = time.perf_counter()
+        results = self.index.search(query, limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats["queries"] += 1
+        self.stats["query_time_total_ms"] += elapsed_ms
+        self.stats["query_time_max_ms"] = max(self.stats["query_time_max_ms"], elapsed_ms)
+        return results
+
+    # --- Build & sinkronisasi ---
+    def load(self) -> None:
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        cursor = MongoDB.get_database()["students"].find({"is_deleted": False}, {"nim": 1, "name": 1})
+        index = PrefixIndex.build((str(doc["_id"]), doc.get("nim", ""), doc.get("name", "")) for doc in cursor)
+        self._watermark = now
+        self.stats["build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        with self._pending_lock:
+            for student_id, nim, name in self._pending:
+                if nim is None:
+                    index.remove(student_id)
+                else:
+                    index.upsert(student_id, nim, name)
+            self._pending = []
+            self.index = index
+        logger.info("Typeahead index built", extra={"students": len(index), "build_ms": self.stats["build_ms"]})
+
+    def poll(self) -> None:
+        now = datetime.now(timezone.utc)
+        since = self._watermark - self.overlap
+        for doc in MongoDB.get_database()["students"].find(
+            {"updated_at": {"$gte": since}},
+            {"nim": 1, "name": 1, "is_deleted": 1}
+        ):
+            if doc.get("is_deleted"):
+                self.index.remove(str(doc["_id"]))
+            else:
+                self.index.upsert(str(doc["_id"]), doc.get("nim", ""), doc.get("name", ""))
+        self._watermark = now
+
+    async def run(self) -> None:
+        while True:
+            try:
+                # Selama index belum siap (mis. database belum tersedia), build diulang di iterasi berikutnya
+                await asyncio.to_thread(self.load if self.index is None else self.poll)
+            except Exception:
+                logger.exception("Typeahead sync failed")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_metrics(self) -> dict:
+        queries = self.stats["queries"]
+        return {
+            "ready": self.ready,
+            "students": len(self.index) if self.index is not None else 0,
+            "memory_bytes": self.index.memory_bytes() if self.index is not None else 0,
+            "build_ms": self.stats["build_ms"],
+            "queries": queries,
+            "query_time_avg_ms": round(self.stats["query_time_total_ms"] / queries, 3) if queries else None,
+            "query_time_max_ms": round(self.stats["query_time_max_ms"], 3)
+        }
+
+
+typeahead_service = TypeaheadService(
+    poll_seconds=float(os.getenv("TYPEAHEAD_POLL_SECONDS", 5)),
+    overlap_seconds=float(os.getenv("TYPEAHEAD_POLL_OVERLAP_SECONDS", 5))
+)
+register_metrics("typeahead", typeahead_service.get_metrics)
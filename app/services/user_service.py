@@ -1,20 +1,26 @@
 from pymongo.database import Database
 from bson import ObjectId
 from bson.errors import InvalidId
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
 
 # Models and Utils (Asumsi path ini benar)
 from app.config.database import MongoDB
 from app.models.user_model import User, UserUpdate
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.utils.security import hash_password, verify_and_update_password, create_access_token
 from app.utils.response import create_response
+from app.services.token_service import RefreshTokenService
+from app.utils.causal_session import causal_sessions
+from app.utils.fieldsets import build_projection
+from app.services.user_summary_service import user_summary_cache
+from app.utils.revocation import revocation_registry
 
 class UserService:
     def __init__(self):
         # Inisialisasi koneksi database dan collection
         db: Database = MongoDB.get_database()
         self.collection = db["users"]
+        self.refresh_tokens = RefreshTokenService()
 
     # PENAMBAHAN: Helper function untuk serialisasi data user
     def _serialize_user(self, user_data: dict) -> dict:
@@ -25,8 +31,8 @@ class UserService:
         if not user_data:
             return None
         
-        user_data["id"] = str(user_data["_id"])
-        del user_data["_id"]
+        if "_id" in user_data:
+            user_data["id"] = str(user_data.pop("_id"))
         
         # Hapus password hash dari respons
         if "hashed_password" in user_data:
@@ -47,7 +53,7 @@ class UserService:
         del user_data["password"] # Hapus password asli
 
         # PENAMBAHAN: Tambahkan field standar saat pembuatan
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         user_data["created_at"] = now
         user_data["updated_at"] = now
         user_data["is_deleted"] = False
@@ -64,9 +70,51 @@ class UserService:
     def authenticate_user(self, email: str, password: str) -> dict | None:
         user = self.collection.find_one({"email": email, "is_deleted": False})
 
-        if not user or not verify_password(password, user.get("hashed_password")):
+        if not user or not user.get("hashed_password"):
             return None
-        
+
+        is_valid, new_hash = verify_and_update_password(password, user["hashed_password"])
+        if not is_valid:
+            return None
+
+        # Rehash transparan jika cost factor hash lama berbeda dengan BCRYPT_ROUNDS saat ini
+        if new_hash:
+            self.collection.update_one(
+                {"_id": user["_id"], "hashed_password": user["hashed_password"]},
+                {"$set": {"hashed_password": new_hash}}
+            )
+
+        refresh_token = self.refresh_tokens.issue(str(user["_id"]))
+        return self._build_token_response(user, refresh_token)
+
+    def refresh_access_token(self, refresh_token: str) -> dict | None:
+        # Tidak ada verifikasi bcrypt di sini: cukup lookup hash token yang terindeks
+        rotated = self.refresh_tokens.rotate(refresh_token)
+        if not rotated:
+            return None
+
+        user_id, new_refresh_token = rotated
+        user = self.collection.find_one({"_id": ObjectId(user_id), "is_deleted": False})
+        if not user or not user.get("is_active", True):
+            self.refresh_tokens.revoke_user(user_id)
+            return None
+
+        return self._build_token_response(user, new_refresh_token)
+
+    def revoke_refresh_token(self, refresh_token: str) -> dict:
+        if not self.refresh_tokens.revoke(refresh_token):
+            return create_response(False, "Refresh token not found", None, "NOT_FOUND")
+        return create_response(True, "Refresh token revoked successfully")
+
+    def revoke_access_token(self, payload: dict) -> dict:
+        # Token lama (sebelum klaim `jti` ditambahkan) tidak bisa dicabut satu per satu
+        if not payload.get("jti"):
+            return create_response(False, "Access token has no token ID", None, "INVALID_TOKEN")
+        expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        revocation_registry.revoke_token(payload["jti"], expires_at)
+        return create_response(True, "Access token revoked successfully")
+
+    def _build_token_response(self, user: dict, refresh_token: str) -> dict:
         access_token_expires = timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)))
         
         # Data yang akan di-encode dalam token
@@ -77,32 +125,45 @@ class UserService:
         # PERBAIKAN: Kembalikan dictionary yang lebih informatif
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
+            "expires_in": int(access_token_expires.total_seconds()),
             "user_info": self._serialize_user(user)
         }
 
-    def get_user_by_id(self, user_id: str) -> dict:
+    def get_user_by_id(self, user_id: str, actor_id: str = None, fields: tuple = None) -> dict:
         # PERBAIKAN: Tangani error ID yang tidak valid secara spesifik
         try:
             obj_id = ObjectId(user_id)
         except InvalidId:
             return create_response(False, "Invalid user ID format", None, "INVALID_ID")
         
-        user = self.collection.find_one({"_id": obj_id, "is_deleted": False})
+        collection = MongoDB.get_collection("users", "users.get_by_id")
+        with causal_sessions.read_session(actor_id) as session:
+            # hashed_password tidak pernah diambil dari database untuk respons
+            user = collection.find_one(
+                {"_id": obj_id, "is_deleted": False},
+                build_projection(fields, exclude=("hashed_password",)),
+                session=session
+            )
         
         if not user:
             return create_response(False, "User not found", None, "NOT_FOUND")
             
         return create_response(True, "User found", self._serialize_user(user))
 
-    def get_all_users(self, skip: int = 0, limit: int = 10) -> dict:
+    def get_all_users(self, skip: int = 0, limit: int = 10, actor_id: str = None, fields: tuple = None) -> dict:
         query = {"is_deleted": False}
         
-        users_cursor = self.collection.find(query).skip(skip).limit(limit)
-        users = [self._serialize_user(user) for user in users_cursor]
-        
-        # PENAMBAHAN: Sertakan total data untuk pagination di frontend
-        total_users = self.collection.count_documents(query)
+        collection = MongoDB.get_collection("users", "users.get_all")
+        with causal_sessions.read_session(actor_id) as session:
+            users_cursor = collection.find(
+                query, build_projection(fields, exclude=("hashed_password",)), session=session
+            ).skip(skip).limit(limit)
+            users = [self._serialize_user(user) for user in users_cursor]
+            
+            # PENAMBAHAN: Sertakan total data untuk pagination di frontend
+            total_users = collection.count_documents(query, session=session)
 
         response_data = {
             "total": total_users,
@@ -112,7 +173,7 @@ class UserService:
         }
         return create_response(True, "Users retrieved successfully", response_data)
 
-    def update_user(self, user_id: str, user_data: UserUpdate) -> dict:
+    def update_user(self, user_id: str, user_data: UserUpdate, actor_id: str = None) -> dict:
         try:
             obj_id = ObjectId(user_id)
         except InvalidId:
@@ -125,19 +186,27 @@ class UserService:
             return create_response(False, "No data provided for update", None, "NO_DATA")
 
         # PENAMBAHAN: Selalu update `updated_at`
-        update_data["updated_at"] = datetime.now()
+        update_data["updated_at"] = datetime.now(timezone.utc)
 
         # Gunakan $inc untuk menaikkan versi secara atomik
-        result = self.collection.update_one(
-            {"_id": obj_id, "is_deleted": False},
-            {
-                "$set": update_data,
-                "$inc": {"version": 1}
-            }
-        )
+        with causal_sessions.write_session(actor_id) as session:
+            result = self.collection.update_one(
+                {"_id": obj_id, "is_deleted": False},
+                {
+                    "$set": update_data,
+                    "$inc": {"version": 1}
+                },
+                session=session
+            )
 
         if result.matched_count == 0:
             return create_response(False, "User not found", None, "NOT_FOUND")
+        user_summary_cache.invalidate(user_id)
+        # Token milik user yang dinonaktifkan langsung ditolak di proses ini; worker lain menyusul lewat polling
+        if update_data.get("is_active") is False:
+            revocation_registry.revoke_user(user_id)
+        elif update_data.get("is_active") is True:
+            revocation_registry.restore_user(user_id)
         
         if result.modified_count == 0:
             return create_response(True, "User data is already up to date", None)
@@ -151,10 +220,13 @@ class UserService:
             return create_response(False, "Invalid user ID format", None, "INVALID_ID")
 
         # PERBAIKAN KRITIS: Pisahkan operator $set dan $inc
+        # `updated_at` ikut diisi agar penghapusan terbaca oleh polling revocation registry
+        now = datetime.now(timezone.utc)
         update_operation = {
             "$set": {
                 "is_deleted": True,
-                "deleted_at": datetime.now()
+                "deleted_at": now,
+                "updated_at": now
             },
             "$inc": {"version": 1}
         }
@@ -166,7 +238,9 @@ class UserService:
         
         if result.modified_count == 0:
             return create_response(False, "User not found or already deleted", None, "NOT_FOUND")
-            
+
+        revocation_registry.revoke_user(user_id)
+        self.refresh_tokens.revoke_user(user_id, reason="user_deleted")
         return create_response(True, "User deleted successfully")
 
 
@@ -0,0 +1,42 @@
+import os
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.config.database import MongoDB
+from app.utils.metrics import register_metrics
+from app.utils.ttl_cache import TTLCache
+
+# Field user yang aman ditampilkan saat di-expand dari dokumen lain
+USER_SUMMARY_FIELDS = ("username", "full_name")
+
+user_summary_cache = TTLCache(
+    max_entries=int(os.getenv("USER_SUMMARY_CACHE_SIZE", 10000)),
+    ttl_seconds=float(os.getenv("USER_SUMMARY_CACHE_TTL_SECONDS", 60))
+)
+register_metrics("user_summary_cache", user_summary_cache.get_metrics)
+
+def get_user_summaries(user_ids) -> dict:
+    """
+    Mengembalikan {user_id: ringkasan_user} untuk semua ID sekaligus.
+    ID yang belum ada di cache diambil dengan satu query `$in`, sehingga jumlah round trip konstan per halaman.
+    """
+    unique_ids = {user_id for user_id in user_ids if user_id}
+    summaries = user_summary_cache.get_many(unique_ids)
+
+    missing = []
+    for user_id in unique_ids - set(summaries):
+        try:
+            missing.append(ObjectId(user_id))
+        except (InvalidId, TypeError):
+            continue
+
+    if missing:
+        projection = {field: 1 for field in USER_SUMMARY_FIELDS}
+        fetched = {
+            str(doc["_id"]): {"id": str(doc["_id"]), **{field: doc.get(field) for field in USER_SUMMARY_FIELDS}}
+            for doc in MongoDB.get_collection("users", "users.get_all").find({"_id": {"$in": missing}}, projection)
+        }
+        user_summary_cache.set_many(fetched)
+        summaries.update(fetched)
+
+    return summaries
@@ -3,10 +3,10 @@ Utilities package initialization
 """
 from app.utils.response import create_response, ResponseModel
 from app.utils.validation import validate_email, validate_required_fields, validate_date_format
-from app.utils.security import hash_password, verify_password, create_access_token, decode_access_token
+from app.utils.security import hash_password, verify_password, verify_and_update_password, create_access_token, decode_access_token
 
 __all__ = [
     'create_response', 'ResponseModel',
     'validate_email', 'validate_required_fields', 'validate_date_format',
-    'hash_password', 'verify_password', 'create_access_token', 'decode_access_token'
+    'hash_password', 'verify_password', 'verify_and_update_password', 'create_access_token', 'decode_access_token'
 ]
\ No newline at end of file
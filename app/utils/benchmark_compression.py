@@ -0,0 +1,106 @@
+"""
+Mengukur byte yang dihemat dibanding CPU yang dipakai untuk tiap encoding dan level kompresi
+pada payload yang mirip respons `GET /students/` dan `GET /users/`, termasuk mode streaming
+dan payload kecil di sekitar `COMPRESSION_MIN_SIZE`.
+
+Penggunaan:
+    python -m app.utils.benchmark_compression --iterations 50
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.middlewares.compression_middleware import _BrotliCompressor, _GzipCompressor, _ZstdCompressor, _is_available
+from app.utils.benchmarking import summarize_ms, time_calls_ms
+
+COMPRESSORS = {"gzip": _GzipCompressor, "br": _BrotliCompressor, "zstd": _ZstdCompressor}
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 10, 19)}
+PROGRAMS = ("Informatika", "Sistem Informasi", "Teknik Elektro", "Manajemen", "Akuntansi")
+NAMES = ("Budi", "Siti", "Agus", "Dewi", "Rahmat", "Putri", "Andi", "Nur", "Fajar", "Wulan")
+
+def student_page(size: int) -> bytes:
+    now = datetime.now(timezone.utc).isoformat()
+    items = [{
+        "id": uuid4().hex[:24],
+        "nim": f"{random.randint(2018, 2025)}{random.randint(0, 999999):06d}",
+        "name": f"{random.choice(NAMES)} {random.choice(NAMES)}",
+        "email": f"student{i}@university.ac.id",
+        "study_program": random.choice(PROGRAMS),
+        "semester": random.randint(1, 14),
+        "gpa": round(random.uniform(2.0, 4.0), 2),
+        "created_by": uuid4().hex[:24],
+        "version": random.randint(1, 5),
+        "guid": f"STUDENT-{uuid4()}",
+        "created_at": now,
+        "updated_at": now
+    } for i in range(size)]
+    body = {"success": True, "message": "Students retrieved successfully", "data": {"items": items, "total": 5000, "page": 1, "size": size}, "error": None}
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+def user_page(size: int) -> bytes:
+    items = [{
+        "id": uuid4().hex[:24],
+        "username": f"user{i}",
+        "email": f"user{i}@university.ac.id",
+        "full_name": f"{random.choice(NAMES)} {random.choice(NAMES)}",
+        "is_active": True,
+        "version": 1
+    } for i in range(size)]
+    body = {"success": True, "message": "Users retrieved successfully", "data": {"total": 500, "page": 1, "limit": size, "data": items}, "error": None}
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+def compress(encoding: str, level: int, payload: bytes, chunk_size: int = 0) -> bytes:
+    """Kompresi sekali jalan, atau per chunk dengan flush seperti respons streaming jika `chunk_size` > 0."""
+    compressor = COMPRESSORS[encoding](level)
+    if not chunk_size:
+        return compressor.compress(payload) + compressor.finish()
+    chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+    out = b"".join(compressor.compress(chunk) + compressor.flush() for chunk in chunks[:-1])
+    return out + compressor.compress(chunks[-1]) + compressor.finish()
+
+def report(label: str, payload: bytes, encodings: list, iterations: int, chunk_size: int = 0) -> None:
+    print(f"\n{label}: {len(payload)} bytes" + (f" (streamed in {chunk_size}-byte chunks)" if chunk_size else ""))
+    print(f"  {'encoding':8s} {'level':>5s} {'out bytes':>10s} {'ratio':>7s} {'p50 ms':>8s} {'saved KB/cpu ms':>16s}")
+    for encoding in encodings:
+        for level in LEVELS[encoding]:
+            out = compress(encoding, level, payload, chunk_size)
+            p50 = summarize_ms(time_calls_ms(lambda: compress(encoding, level, payload, chunk_size), iterations))["p50"]
+            saved_per_ms = (len(payload) - len(out)) / 1024 / p50 if p50 else float("inf")
+            print(f"  {encoding:8s} {level:5d} {len(out):10d} {len(out) / len(payload):7.3f} {p50:8.3f} {saved_per_ms:16.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression encodings and levels")
+    parser.add_argument("--iterations", type=int, default=50, help="Compressions timed per encoding/level")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    encodings = [e for e in ("gzip", "br", "zstd") if _is_available(e)]
+    skipped = sorted(set(COMPRESSORS) - set(encodings))
+    if skipped:
+        print(f"Skipping encodings without installed packages: {', '.join(skipped)}")
+
+    page = student_page(100)
+    report("GET /students/ (limit=100)", page, encodings, args.iterations)
+    report("GET /students/ (limit=100)", page, encodings, args.iterations, chunk_size=4096)
+    report("GET /students/ (limit=10)", student_page(10), encodings, args.iterations)
+    report("GET /users/ (limit=100)", user_page(100), encodings, args.iterations)
+
+    # Di bawah ukuran tertentu, byte yang dihemat tidak sebanding dengan CPU dan header tambahan
+    print("\nSmall payloads (default levels), for choosing COMPRESSION_MIN_SIZE:")
+    print(f"  {'bytes':>6s} " + " ".join(f"{e + ' out':>10s} {e + ' ms':>9s}" for e in encodings))
+    defaults = {"gzip": 6, "br": 4, "zstd": 3}
+    full = student_page(20)
+    for size in (256, 512, 1024, 2048, 4096):
+        payload = full[:size]
+        cells = []
+        for encoding in encodings:
+            out = compress(encoding, defaults[encoding], payload)
+            p50 = summarize_ms(time_calls_ms(lambda: compress(encoding, defaults[encoding], payload), args.iterations))["p50"]
+            cells.append(f"{len(out):10d} {p50:9.4f}")
+        print(f"  {size:6d} " + " ".join(cells))
+
+if __name__ == "__main__":
+    main()
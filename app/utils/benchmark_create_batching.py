@@ -0,0 +1,91 @@
+"""
+Mengukur throughput dan latensi per request untuk create mahasiswa dengan dan tanpa InsertBatcher,
+pada beberapa tingkat concurrency, memakai write concern tier `students.create`.
+
+Memakai MONGODB_URI/DATABASE_NAME dari .env dan collection sementara `benchmark_insert_batching`
+yang dihapus setelah selesai; jalankan terhadap database non-produksi.
+
+Penggunaan:
+    python -m app.utils.benchmark_create_batching --requests 2000 --concurrency 1,10,50,200
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.config.database import MongoDB
+from app.config.tiers import get_tier_options
+from app.utils.benchmarking import summarize_ms
+from app.utils.write_batcher import InsertBatcher
+
+COLLECTION_NAME = "benchmark_insert_batching"
+
+def make_document(i: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "nim": f"B{uuid4().hex[:13]}",
+        "name": f"Benchmark Student {i}",
+        "email": f"bench{i}@university.ac.id",
+        "study_program": "Informatika",
+        "semester": 1,
+        "gpa": 3.0,
+        "created_by": "benchmark",
+        "version": 1,
+        "guid": f"STUDENT-{uuid4()}",
+        "created_at": now,
+        "updated_at": now,
+        "is_deleted": False
+    }
+
+async def run_case(insert, total: int, concurrency: int) -> tuple:
+    """Menjalankan `total` insert dengan `concurrency` klien paralel; mengembalikan (docs/detik, latensi ms)."""
+    latencies = []
+    counter = iter(range(total))
+
+    async def client():
+        for i in counter:
+            start = time.perf_counter()
+            await insert(make_document(i))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start), latencies
+
+async def run(total: int, concurrency_levels: list, batch_size: int, wait_ms: float) -> None:
+    collection = MongoDB.get_database()[COLLECTION_NAME].with_options(**get_tier_options("students.create"))
+    collection.create_index([("nim", 1)], unique=True, partialFilterExpression={"is_deleted": False})
+
+    # Sama seperti create_student: insert_one sinkron di event loop
+    async def direct_insert(document):
+        collection.insert_one(document)
+
+    try:
+        print(f"{'mode':24s} {'clients':>7s} {'docs/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'avg batch':>9s}")
+        for concurrency in concurrency_levels:
+            throughput, latencies = await run_case(direct_insert, total, concurrency)
+            s = summarize_ms(latencies)
+            print(f"{'insert_one':24s} {concurrency:7d} {throughput:9.0f} {s['p50']:8.2f} {s['p95']:8.2f} {s['p99']:8.2f} {'-':>9s}")
+
+            batcher = InsertBatcher(collection, max_batch_size=batch_size, max_wait_ms=wait_ms)
+            throughput, latencies = await run_case(batcher.insert, total, concurrency)
+            s = summarize_ms(latencies)
+            label = f"batcher ({batch_size}/{wait_ms:g}ms)"
+            avg_batch = batcher.get_metrics()["avg_batch_size"]
+            print(f"{label:24s} {concurrency:7d} {throughput:9.0f} {s['p50']:8.2f} {s['p95']:8.2f} {s['p99']:8.2f} {avg_batch:9.1f}")
+    finally:
+        MongoDB.get_database().drop_collection(COLLECTION_NAME)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched vs unbatched student inserts")
+    parser.add_argument("--requests", type=int, default=2000, help="Inserts per case")
+    parser.add_argument("--concurrency", default="1,10,50,200", help="Comma-separated client counts")
+    parser.add_argument("--batch-size", type=int, default=100, help="STUDENT_CREATE_BATCH_SIZE to test")
+    parser.add_argument("--wait-ms", type=float, default=5, help="STUDENT_CREATE_BATCH_WAIT_MS to test")
+    args = parser.parse_args()
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    asyncio.run(run(args.requests, levels, args.batch_size, args.wait_ms))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Membandingkan biaya encode/decode JWT per codec (jose, pyjwt) dan algoritma (HS256, ES256, EdDSA).
+Key dibuat sementara di memori; tidak memakai konfigurasi JWT aplikasi.
+
+Penggunaan:
+    python -m app.utils.benchmark_jwt --iterations 2000
+"""
+import argparse
+import secrets
+import time
+
+from app.utils.jwt_engine import CODECS, SigningKey, TokenEngine
+
+ALGORITHMS = ("HS256", "ES256", "EdDSA")
+
+def make_key(algorithm: str) -> SigningKey:
+    """Membuat key sementara untuk `algorithm` dalam format yang dipakai load_keys()."""
+    if algorithm.startswith("HS"):
+        secret = secrets.token_urlsafe(32)
+        return SigningKey("bench", algorithm, secret, secret)
+
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    private_key = ed25519.Ed25519PrivateKey.generate() if algorithm == "EdDSA" else ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode("utf-8")
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode("utf-8")
+    return SigningKey("bench", algorithm, private_pem, public_pem)
+
+def measure_us(func, iterations: int) -> float:
+    """Rata-rata waktu per panggilan dalam mikrodetik."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1_000_000 / iterations
+
+def run(iterations: int) -> None:
+    claims = {"sub": "bench@example.com", "id": "0" * 24, "exp": int(time.time()) + 3600, "jti": secrets.token_hex(16)}
+    print(f"{'codec':8s} {'alg':6s} {'encode us':>10s} {'decode us':>10s} {'token bytes':>12s}")
+    for codec_name, codec_class in CODECS.items():
+        try:
+            codec = codec_class()
+        except (ImportError, RuntimeError) as e:
+            print(f"{codec_name:8s} skipped: {e}")
+            continue
+        for algorithm in ALGORITHMS:
+            if algorithm not in codec.supported_algorithms:
+                print(f"{codec_name:8s} {algorithm:6s} not supported")
+                continue
+            engine = TokenEngine([make_key(algorithm)], "bench", codec)
+            token = engine.encode(claims)
+            assert engine.decode(token) is not None
+            encode_us = measure_us(lambda: engine.encode(claims), iterations)
+            decode_us = measure_us(lambda: engine.decode(token), iterations)
+            print(f"{codec_name:8s} {algorithm:6s} {encode_us:10.1f} {decode_us:10.1f} {len(token):12d}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JWT codecs and signing algorithms")
+    parser.add_argument("--iterations", type=int, default=2000, help="Encode/decode calls per combination")
+    args = parser.parse_args()
+    run(args.iterations)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Mengukur overhead per request dari LoggingMiddleware: tanpa logging, dengan pipeline antrean
+non-blocking (setup_logging), dan dengan StreamHandler sinkron sebagai pembanding. Juga menguji
+burst log untuk melihat berapa record yang dibuang alih-alih memblokir pemanggil.
+Output log ditulis ke `--sink` (default os.devnull). Menulis ke devnull hampir tanpa biaya I/O sehingga
+menguntungkan handler sinkron; gunakan file atau pipe sungguhan untuk melihat efek I/O yang lambat.
+
+Penggunaan:
+    python -m app.utils.benchmark_logging --requests 20000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+from app.config import logging_config
+from app.config.logging_config import JsonFormatter, setup_logging, start_logging, stop_logging
+from app.middlewares.logging_middleware import LoggingMiddleware
+from app.utils.benchmarking import summarize_ms
+
+SCOPE = {"type": "http", "method": "GET", "path": "/students/", "headers": [(b"user-agent", b"benchmark")]}
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def measure(app, requests: int) -> list:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await app(dict(SCOPE), receive, send)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def burst(records: int) -> tuple:
+    """Menulis `records` log secepat mungkin; mengembalikan (p99 ms per panggilan, jumlah yang dibuang)."""
+    logger = logging.getLogger("app.benchmark")
+    dropped_before = logging_config.get_logging_metrics().get("dropped", 0)
+    timings = []
+    for i in range(records):
+        start = time.perf_counter()
+        logger.info("burst", extra={"i": i})
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize_ms(timings)["p99"], logging_config.get_logging_metrics().get("dropped", 0) - dropped_before
+
+def report(label: str, timings: list, baseline_p50: float = None) -> None:
+    s = summarize_ms(timings)
+    extra = f"  overhead p50={(s['p50'] - baseline_p50) * 1000:7.1f} us" if baseline_p50 is not None else ""
+    print(f"{label:30s} p50={s['p50'] * 1000:7.1f} us  p99={s['p99'] * 1000:8.1f} us{extra}", file=sys.__stdout__)
+
+async def run(requests: int, burst_records: int, sink: str) -> None:
+    os.environ["LOG_SAMPLE_RATES"] = ""
+    bare = await measure(endpoint, requests)
+    report("no middleware", bare)
+    baseline = summarize_ms(bare)["p50"]
+
+    # Pipeline aplikasi: logger -> antrean terbatas -> writer thread -> devnull
+    sys.stdout = open(sink, "w")
+    setup_logging()
+    start_logging()
+    report("queue handler (app default)", await measure(LoggingMiddleware(endpoint), requests), baseline)
+
+    # Pembanding: format dan tulis langsung di event loop
+    root = logging.getLogger()
+    queued_handlers = root.handlers
+    sync_handler = logging.StreamHandler(sys.stdout)
+    sync_handler.setFormatter(JsonFormatter())
+    root.handlers = [sync_handler]
+    report("synchronous StreamHandler", await measure(LoggingMiddleware(endpoint), requests), baseline)
+    root.handlers = queued_handlers
+
+    p99, dropped = burst(burst_records)
+    print(f"\nburst of {burst_records} records: p99 per log call={p99 * 1000:.1f} us, dropped={dropped} "
+          f"(LOG_QUEUE_SIZE={logging_config.get_logging_metrics()['queue_capacity']})", file=sys.__stdout__)
+    stop_logging()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request logging overhead")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per case")
+    parser.add_argument("--burst", type=int, default=100000, help="Records written in the burst test")
+    parser.add_argument("--sink", default=os.devnull, help="File the log output is written to")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.burst, args.sink))
+
+if __name__ == "__main__":
+    main()
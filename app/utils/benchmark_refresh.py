@@ -0,0 +1,59 @@
+"""
+Membandingkan biaya login (`authenticate_user`, termasuk verifikasi bcrypt) dengan refresh token
+(`refresh_access_token`, hanya lookup hash terindeks) terhadap MongoDB sungguhan.
+
+Memakai MONGODB_URI/DATABASE_NAME dari .env; jalankan terhadap database non-produksi.
+User dan refresh token sementara dihapus setelah benchmark selesai.
+
+Penggunaan:
+    python -m app.utils.benchmark_refresh --iterations 50
+"""
+import argparse
+import secrets
+from uuid import uuid4
+
+from bson import ObjectId
+
+from app.config.database import MongoDB
+from app.models.user_model import User
+from app.services.user_service import UserService
+from app.utils.benchmarking import format_summary, summarize_ms, time_calls_ms
+from app.utils.security import BCRYPT_ROUNDS
+
+def run(iterations: int) -> None:
+    service = UserService()
+    email = f"bench-{uuid4().hex[:12]}@example.com"
+    password = secrets.token_urlsafe(16)
+    created = service.create_user(User(username="benchmark", email=email, password=password, full_name="Benchmark User"))
+    user_id = created["data"]["id"]
+
+    try:
+        login_timings = time_calls_ms(lambda: service.authenticate_user(email, password), iterations)
+
+        # Setiap refresh merotasi token, jadi token berikutnya diambil dari respons sebelumnya
+        state = {"token": service.authenticate_user(email, password)["refresh_token"]}
+
+        def refresh():
+            state["token"] = service.refresh_access_token(state["token"])["refresh_token"]
+
+        refresh_timings = time_calls_ms(refresh, iterations)
+    finally:
+        MongoDB.get_database()["users"].delete_one({"_id": ObjectId(user_id)})
+        service.refresh_tokens.collection.delete_many({"user_id": user_id})
+
+    print(f"BCRYPT_ROUNDS={BCRYPT_ROUNDS}")
+    print(format_summary("login (bcrypt)", login_timings))
+    print(format_summary("refresh (rotate)", refresh_timings))
+    login_p50 = summarize_ms(login_timings)["p50"]
+    refresh_p50 = summarize_ms(refresh_timings)["p50"]
+    if refresh_p50:
+        print(f"\nrefresh is {login_p50 / refresh_p50:.1f}x cheaper than login at p50")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login vs refresh token cost")
+    parser.add_argument("--iterations", type=int, default=50, help="Logins and refreshes to time")
+    args = parser.parse_args()
+    run(args.iterations)
+
+if __name__ == "__main__":
+    main()
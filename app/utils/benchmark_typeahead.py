@@ -0,0 +1,85 @@
+"""
+Mengukur footprint memori dan latensi query PrefixIndex (GET /students/suggest),
+dan opsional membandingkannya dengan fallback regex ke MongoDB.
+
+Secara default memakai data sintetis; `--from-db` membangun index dari collection `students`,
+`--compare-db` menjalankan query yang sama lewat regex di database (hanya baca).
+
+Penggunaan:
+    python -m app.utils.benchmark_typeahead --students 100000
+    python -m app.utils.benchmark_typeahead --from-db --compare-db
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from app.services.typeahead_service import PrefixIndex
+from app.utils.benchmarking import format_summary, time_calls_ms
+
+FIRST_NAMES = ("Budi", "Siti", "Agus", "Dewi", "Rahmat", "Putri", "Andi", "Nur", "Fajar", "Wulan",
+               "Bayu", "Intan", "Rizky", "Ayu", "Dimas", "Lestari", "Hendra", "Maya", "Yoga", "Ratna")
+LAST_NAMES = ("Santoso", "Wijaya", "Pratama", "Saputra", "Hidayat", "Kusuma", "Nugroho", "Lestari",
+              "Permata", "Setiawan", "Gunawan", "Halim", "Siregar", "Nasution", "Simanjuntak", "Wibowo")
+
+def synthetic_students(count: int):
+    for i in range(count):
+        name = f"{random.choice(FIRST_NAMES)} {random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
+        yield f"{i:024x}", f"{random.randint(2018, 2025)}{i:06d}", name
+
+def database_students():
+    from app.config.database import MongoDB
+    for doc in MongoDB.get_database()["students"].find({"is_deleted": False}, {"nim": 1, "name": 1}):
+        yield str(doc["_id"]), doc.get("nim", ""), doc.get("name", "")
+
+def sample_queries(students: list, count: int) -> list:
+    """Prefix 1-6 karakter dari nama atau NIM, seperti yang diketik pengguna."""
+    queries = []
+    for _ in range(count):
+        _, nim, name = random.choice(students)
+        source = random.choice((nim, random.choice(name.split() or [name])))
+        queries.append(source[:random.randint(1, 6)])
+    return queries
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the student typeahead index")
+    parser.add_argument("--students", type=int, default=100000, help="Synthetic students to index")
+    parser.add_argument("--queries", type=int, default=5000, help="Queries to time")
+    parser.add_argument("--limit", type=int, default=10, help="Suggestions per query")
+    parser.add_argument("--from-db", action="store_true", help="Index the students collection instead of synthetic data")
+    parser.add_argument("--compare-db", action="store_true", help="Also time the MongoDB regex fallback")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    students = list(database_students() if args.from_db else synthetic_students(args.students))
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = PrefixIndex.build(students)
+    build_ms = (time.perf_counter() - start) * 1000
+    traced_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"students indexed      {len(index)}")
+    print(f"build time            {build_ms:.0f} ms")
+    print(f"memory (tracemalloc)  {traced_bytes / 1024 / 1024:.1f} MB ({traced_bytes / max(len(index), 1):.0f} B/student)")
+    print(f"memory (estimate)     {index.memory_bytes() / 1024 / 1024:.1f} MB (also reported in /admin/metrics)")
+    if len(index):
+        print(f"per 100k students     {traced_bytes / len(index) * 100000 / 1024 / 1024:.1f} MB\n")
+
+    queries = sample_queries(students, args.queries)
+    it = iter(queries)
+    print(format_summary("PrefixIndex.search", time_calls_ms(lambda: index.search(next(it), args.limit), len(queries))))
+
+    if args.compare_db:
+        from app.services.student_service import StudentService
+        # typeahead_service tidak dijalankan di sini, sehingga suggest_students memakai fallback regex
+        service = StudentService()
+        db_queries = queries[:min(len(queries), 500)]
+        it = iter(db_queries)
+        print(format_summary("MongoDB regex fallback", time_calls_ms(lambda: service.suggest_students(next(it), args.limit), len(db_queries))))
+
+if __name__ == "__main__":
+    main()
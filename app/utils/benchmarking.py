@@ -0,0 +1,33 @@
+"""Helper kecil untuk script benchmark di app/utils (benchmark_*.py)."""
+import time
+from typing import Callable, List
+
+def time_calls_ms(func: Callable[[], object], iterations: int) -> List[float]:
+    """Menjalankan `func` sebanyak `iterations` kali dan mengembalikan durasi tiap panggilan (ms)."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def summarize_ms(timings: List[float]) -> dict:
+    """Rata-rata dan persentil (p50/p95/p99) dari daftar durasi dalam milidetik."""
+    if not timings:
+        return {"n": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(timings)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "n": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99)
+    }
+
+def format_summary(label: str, timings: List[float]) -> str:
+    s = summarize_ms(timings)
+    return f"{label:28s} n={s['n']:<6d} mean={s['mean']:9.3f} ms  p50={s['p50']:9.3f}  p95={s['p95']:9.3f}  p99={s['p99']:9.3f}"
@@ -0,0 +1,56 @@
+"""
+Menentukan cost factor bcrypt yang memenuhi target latensi verifikasi di mesin saat ini.
+
+Penggunaan:
+    python -m app.utils.calibrate_bcrypt --target-ms 250
+"""
+import argparse
+import time
+
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+def measure_verify_ms(rounds: int, samples: int = 3) -> float:
+    """Mengukur median waktu verifikasi (ms) untuk hash dengan cost `rounds`."""
+    hashed = bcrypt.using(rounds=rounds).hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def calibrate(target_ms: float, min_rounds: int = 10, samples: int = 3) -> int:
+    """
+    Mengembalikan cost tertinggi yang waktu verifikasinya masih <= target_ms,
+    namun tidak lebih rendah dari `min_rounds`.
+    """
+    chosen = max(MIN_ROUNDS, min_rounds)
+    rounds = chosen
+    while rounds <= MAX_ROUNDS:
+        elapsed = measure_verify_ms(rounds, samples)
+        print(f"rounds={rounds:2d}  verify={elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+        # Setiap kenaikan cost menggandakan waktu; berhenti jika langkah berikutnya pasti melewati target
+        if elapsed * 2 > target_ms:
+            break
+        rounds += 1
+    return chosen
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate bcrypt cost factor for this machine")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Target verify latency in milliseconds")
+    parser.add_argument("--min-rounds", type=int, default=10, help="Lowest cost factor that may be recommended")
+    parser.add_argument("--samples", type=int, default=3, help="Verify samples per cost factor")
+    args = parser.parse_args()
+
+    rounds = calibrate(args.target_ms, args.min_rounds, args.samples)
+    print(f"\nRecommended setting:\nBCRYPT_ROUNDS={rounds}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+from app.config.database import MongoDB
+
+class CausalSessionStore:
+    """
+    Menyimpan clusterTime/operationTime dari write terakhir per pemanggil (user id).
+    Read berikutnya dari pemanggil yang sama memakai causal session yang di-advance ke waktu tersebut,
+    sehingga secondary menunggu sampai write itu terlihat (read-your-writes).
+    Pemanggil lain tidak memakai session sama sekali.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, actor_id: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(actor_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[2] > self.ttl_seconds:
+                del self._entries[actor_id]
+                return None
+            return entry
+
+    def _put(self, actor_id: str, cluster_time, operation_time) -> None:
+        with self._lock:
+            self._entries[actor_id] = (cluster_time, operation_time, time.monotonic())
+            self._entries.move_to_end(actor_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def has_pending_write(self, actor_id: Optional[str]) -> bool:
+        """True jika read dari pemanggil ini masih harus memakai causal session (baru saja melakukan write)."""
+        return bool(actor_id) and self._get(actor_id) is not None
+
+    @contextmanager
+    def write_session(self, actor_id: Optional[str]):
+        if not actor_id:
+            yield None
+            return
+        with MongoDB.client.start_session(causal_consistency=True) as session:
+            yield session
+            if session.operation_time is not None:
+                self._put(actor_id, session.cluster_time, session.operation_time)
+
+    @contextmanager
+    def read_session(self, actor_id: Optional[str]):
+        entry = self._get(actor_id) if actor_id else None
+        if entry is None:
+            yield None
+            return
+        with MongoDB.client.start_session(causal_consistency=True) as session:
+            if entry[0] is not None:
+                session.advance_cluster_time(entry[0])
+            session.advance_operation_time(entry[1])
+            yield session
+
+
+causal_sessions = CausalSessionStore()
@@ -0,0 +1,56 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Type
+
+from pydantic import BaseModel, create_model
+
+# Field yang tidak boleh pernah diminta lewat ?fields=, apa pun modelnya
+FORBIDDEN_FIELDS = {"hashed_password", "password"}
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Tuple[Optional[Tuple[str, ...]], Optional[str]]:
+    """
+    Mengubah parameter `fields=nim,name` menjadi tuple nama field yang terurut.
+    Mengembalikan (None, None) jika parameter kosong, atau (None, pesan_error) jika ada field tidak dikenal.
+    """
+    if not fields:
+        return None, None
+
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    if not requested:
+        return None, None
+
+    forbidden = requested & FORBIDDEN_FIELDS
+    if forbidden:
+        return None, f"Fields not allowed: {', '.join(sorted(forbidden))}"
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        return None, f"Unknown fields: {', '.join(sorted(unknown))}"
+    return tuple(sorted(requested)), None
+
+def parse_expand(expand: Optional[str], allowed: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Optional[str]]:
+    """Mengubah `expand=created_by` menjadi tuple relasi; relasi yang tidak didukung menghasilkan pesan error."""
+    if not expand:
+        return (), None
+    requested = {e.strip() for e in expand.split(",") if e.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        return (), f"Cannot expand: {', '.join(sorted(unknown))}"
+    return tuple(sorted(requested)), None
+
+def build_projection(field_names: Optional[Tuple[str, ...]], exclude: Tuple[str, ...] = ()) -> Optional[dict]:
+    """Membuat projection MongoDB; field `id` dipetakan ke `_id`."""
+    if field_names is None:
+        return {name: 0 for name in exclude} or None
+    projection = {name: 1 for name in field_names if name != "id"}
+    if "id" not in field_names:
+        projection["_id"] = 0
+    return projection
+
+@lru_cache(maxsize=256)
+def get_partial_model(model: Type[BaseModel], field_names: Tuple[str, ...]) -> Type[BaseModel]:
+    """Model respons yang hanya berisi `field_names`, dibuat sekali per kombinasi field lalu di-cache."""
+    definitions = {name: (model.model_fields[name].annotation, model.model_fields[name]) for name in field_names}
+    return create_model(
+        f"{model.__name__}_{'_'.join(field_names)}",
+        __config__=model.model_config,
+        **definitions
+    )
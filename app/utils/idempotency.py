@@ -0,0 +1,200 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import DuplicateKeyError
+
+from app.config.database import MongoDB
+from app.utils.metrics import register_metrics
+from app.utils.response import create_response
+
+logger = logging.getLogger(__name__)
+
+def fingerprint(payload: dict) -> str:
+    """Hash kanonis dari payload request, untuk mendeteksi key yang dipakai ulang dengan body berbeda."""
+    return hashlib.sha256(json.dumps(jsonable_encoder(payload), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Menyimpan respons dari request dengan header `Idempotency-Key`.
+    - Respons selesai disimpan di collection `idempotency_keys` (TTL) dan di LRU in-process.
+    - Request bersamaan dengan key yang sama di proses ini menunggu request pertama, bukan mengerjakan ulang.
+    - Di proses lain, key yang masih diproses dijawab 409 IDEMPOTENCY_IN_PROGRESS.
+    - Klaim `in_progress` hanya berlaku selama lease (`locked_until`), terpisah dari TTL hasil; klaim yang
+      lease-nya habis (worker crash, release gagal) boleh diambil alih oleh retry berikutnya.
+    """
+
+    def __init__(self, ttl_hours: float = 24, max_cached: int = 10000, lease_seconds: float = 60):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_cached = max_cached
+        self._collection = None
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._in_flight = {}
+        self.stats = {"executed": 0, "replayed_memory": 0, "replayed_db": 0, "coalesced": 0, "conflicts": 0, "taken_over": 0}
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = MongoDB.get_database()["idempotency_keys"]
+            self._collection.create_index([("expires_at", 1)], expireAfterSeconds=0)
+        return self._collection
+
+    def _cache_get(self, key: str) -> Optional[dict]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _cache_put(self, key: str, entry: dict) -> None:
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    async def _detached(func, *args):
+        # Context kosong: deadline request (pymongo.timeout) yang mungkin sudah habis tidak ikut berlaku
+        return await asyncio.to_thread(contextvars.Context().run, func, *args)
+
+    def _replay(self, entry: dict, request_hash: str) -> Tuple[int, dict, bool]:
+        if entry["request_hash"] != request_hash:
+            self.stats["conflicts"] += 1
+            return 422, create_response(False, "Idempotency-Key was already used with a different request body", None, "IDEMPOTENCY_KEY_MISMATCH"), False
+        return entry["status_code"], entry["content"], True
+
+    async def execute(
+        self,
+        scope: str,
+        idempotency_key: Optional[str],
+        request_hash: str,
+        handler: Callable[[], Awaitable[Tuple[int, dict]]]
+    ) -> Tuple[int, dict, bool]:
+        """
+        Menjalankan handler sekali per (scope, key). Mengembalikan (status_code, content, replayed).
+        Tanpa key, handler langsung dijalankan.
+        """
+        if not idempotency_key:
+            status_code, content = await handler()
+            return status_code, jsonable_encoder(content), False
+
+        key = f"{scope}:{idempotency_key}"
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.stats["replayed_memory"] += 1
+            return self._replay(cached, request_hash)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.stats["coalesced"] += 1
+            try:
+                entry = await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise
+                # Request pertama gagal atau sedang diproses proses lain; klien boleh mencoba lagi
+                return 409, create_response(False, "A request with this Idempotency-Key is still being processed", None, "IDEMPOTENCY_IN_PROGRESS"), False
+            return self._replay(entry, request_hash)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            return await self._execute_once(key, request_hash, handler, future)
+        finally:
+            self._in_flight.pop(key, None)
+            if not future.done():
+                future.cancel()
+
+    async def _claim(self, key: str, request_hash: str):
+        """
+        Mengklaim key di database agar proses lain tidak mengerjakan request yang sama.
+        Mengembalikan None jika klaim berhasil, dokumen tersimpan jika key sudah selesai/sedang diproses.
+        """
+        now = datetime.now(timezone.utc)
+        claim = {
+            "request_hash": request_hash,
+            "status": "in_progress",
+            "created_at": now,
+            "locked_until": now + self.lease,
+            "expires_at": now + self.ttl
+        }
+        try:
+            await asyncio.to_thread(self.collection.insert_one, {"_id": key, **claim})
+            return None
+        except DuplicateKeyError:
+            pass
+
+        stored = await asyncio.to_thread(self.collection.find_one, {"_id": key})
+        if stored is None or stored["status"] == "completed":
+            return stored
+        locked_until = stored.get("locked_until")
+        if locked_until is not None and locked_until.replace(tzinfo=timezone.utc) > now:
+            return stored
+
+        # Lease habis: pemilik klaim crash atau gagal melepas klaim; ambil alih secara atomik
+        taken = await asyncio.to_thread(
+            self.collection.find_one_and_update,
+            {"_id": key, "status": "in_progress", "locked_until": locked_until},
+            {"$set": claim}
+        )
+        if taken is None:
+            return await asyncio.to_thread(self.collection.find_one, {"_id": key}) or stored
+        self.stats["taken_over"] += 1
+        return None
+
+    async def _execute_once(self, key, request_hash, handler, future) -> Tuple[int, dict, bool]:
+        stored = await self._claim(key, request_hash)
+        if stored is not None:
+            if stored["status"] == "completed":
+                self.stats["replayed_db"] += 1
+                entry = {k: stored[k] for k in ("request_hash", "status_code", "content")}
+                self._cache_put(key, entry)
+                future.set_result(entry)
+                return self._replay(entry, request_hash)
+            self.stats["conflicts"] += 1
+            return 409, create_response(False, "A request with this Idempotency-Key is still being processed", None, "IDEMPOTENCY_IN_PROGRESS"), False
+
+        try:
+            status_code, content = await handler()
+        except BaseException:
+            # Lepas klaim agar retry berikutnya bisa diproses; jika gagal, klaim tetap kedaluwarsa setelah lease
+            try:
+                await self._detached(self.collection.delete_one, {"_id": key, "status": "in_progress"})
+            except Exception:
+                logger.exception("Failed to release idempotency claim", extra={"key": key})
+            raise
+
+        self.stats["executed"] += 1
+        entry = {"request_hash": request_hash, "status_code": status_code, "content": jsonable_encoder(content)}
+        await self._detached(
+            self.collection.update_one,
+            {"_id": key},
+            {"$set": {**entry, "status": "completed"}, "$unset": {"locked_until": ""}}
+        )
+        self._cache_put(key, entry)
+        future.set_result(entry)
+        return status_code, entry["content"], False
+
+    def get_metrics(self) -> dict:
+        return {**self.stats, "cached": len(self._cache), "in_flight": len(self._in_flight)}
+
+
+idempotency_store = IdempotencyStore(
+    ttl_hours=float(os.getenv("IDEMPOTENCY_TTL_HOURS", 24)),
+    max_cached=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 10000)),
+    lease_seconds=float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", 60))
+)
+register_metrics("idempotency", idempotency_store.get_metrics)
@@ -0,0 +1,204 @@
+import base64
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+ASYMMETRIC_ALGORITHMS = {"ES256", "ES384", "RS256", "EdDSA"}
+
+
+class JoseCodec:
+    """Codec default menggunakan python-jose (tidak mendukung EdDSA)."""
+    name = "jose"
+    supported_algorithms = SYMMETRIC_ALGORITHMS | {"ES256", "ES384", "RS256"}
+
+    def __init__(self):
+        from jose import jwt, JWTError
+        self._jwt = jwt
+        self.errors = (JWTError,)
+
+    def encode(self, claims: dict, key: str, algorithm: str, headers: dict) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict:
+        return self._jwt.decode(token, key, algorithms=[algorithm])
+
+    def get_unverified_header(self, token: str) -> dict:
+        return self._jwt.get_unverified_header(token)
+
+
+class PyJWTCodec:
+    """Codec menggunakan PyJWT (`PyJWT[crypto]`), mendukung EdDSA. Aktifkan dengan JWT_CODEC=pyjwt."""
+    name = "pyjwt"
+    supported_algorithms = SYMMETRIC_ALGORITHMS | ASYMMETRIC_ALGORITHMS
+
+    def __init__(self):
+        try:
+            import jwt
+        except ImportError as e:
+            raise RuntimeError("JWT_CODEC=pyjwt requires the PyJWT package") from e
+        self._jwt = jwt
+        self.errors = (jwt.PyJWTError,)
+
+    def encode(self, claims: dict, key: str, algorithm: str, headers: dict) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict:
+        return self._jwt.decode(token, key, algorithms=[algorithm])
+
+    def get_unverified_header(self, token: str) -> dict:
+        return self._jwt.get_unverified_header(token)
+
+
+CODECS = {
+    JoseCodec.name: JoseCodec,
+    PyJWTCodec.name: PyJWTCodec,
+}
+
+
+class SigningKey:
+    """Satu key JWT yang diidentifikasi oleh `kid`. Key tanpa signing material hanya dipakai untuk verifikasi."""
+
+    def __init__(self, kid: str, algorithm: str, signing_key: Optional[str], verifying_key: str):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm in SYMMETRIC_ALGORITHMS
+
+    def to_jwk(self) -> Optional[dict]:
+        """Representasi JWK publik; None untuk key simetris yang tidak boleh dipublikasikan."""
+        if self.is_symmetric:
+            return None
+
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+        public_key = serialization.load_pem_public_key(self.verifying_key.encode("utf-8"))
+        jwk = {"kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+        if isinstance(public_key, ec.EllipticCurvePublicKey):
+            numbers = public_key.public_numbers()
+            size = (public_key.curve.key_size + 7) // 8
+            jwk.update({
+                "kty": "EC",
+                "crv": {256: "P-256", 384: "P-384"}[public_key.curve.key_size],
+                "x": _b64url(numbers.x.to_bytes(size, "big")),
+                "y": _b64url(numbers.y.to_bytes(size, "big"))
+            })
+        elif isinstance(public_key, ed25519.Ed25519PublicKey):
+            raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            jwk.update({"kty": "OKP", "crv": "Ed25519", "x": _b64url(raw)})
+        elif isinstance(public_key, rsa.RSAPublicKey):
+            numbers = public_key.public_numbers()
+            jwk.update({
+                "kty": "RSA",
+                "n": _b64url(numbers.n.to_bytes((numbers.n.bit_length() + 7) // 8, "big")),
+                "e": _b64url(numbers.e.to_bytes((numbers.e.bit_length() + 7) // 8, "big"))
+            })
+        return jwk
+
+
+class TokenEngine:
+    """Menandatangani token dengan key aktif dan memverifikasi token dengan key mana pun berdasarkan `kid`."""
+
+    def __init__(self, keys: List[SigningKey], active_kid: str, codec):
+        self.keys: Dict[str, SigningKey] = {key.kid: key for key in keys}
+        if active_kid not in self.keys or self.keys[active_kid].signing_key is None:
+            raise ValueError(f"Active JWT key '{active_kid}' is not configured with signing material")
+        for key in keys:
+            if key.algorithm not in codec.supported_algorithms:
+                hint = "; set JWT_CODEC=pyjwt" if key.algorithm in PyJWTCodec.supported_algorithms else ""
+                raise ValueError(f"JWT codec '{codec.name}' does not support algorithm {key.algorithm} (key '{key.kid}'){hint}")
+        self.active_key = self.keys[active_kid]
+        self.codec = codec
+
+    def encode(self, claims: dict) -> str:
+        key = self.active_key
+        return self.codec.encode(claims, key.signing_key, key.algorithm, {"kid": key.kid})
+
+    def decode(self, token: str) -> Optional[dict]:
+        try:
+            header = self.codec.get_unverified_header(token)
+            # Token lama tanpa `kid` diverifikasi dengan key aktif
+            key = self.keys.get(header.get("kid", self.active_key.kid))
+            if key is None or header.get("alg") != key.algorithm:
+                return None
+            return self.codec.decode(token, key.verifying_key, key.algorithm)
+        except self.codec.errors:
+            return None
+
+    def jwks(self) -> dict:
+        return {"keys": [jwk for jwk in (key.to_jwk() for key in self.keys.values()) if jwk]}
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _read_file(path: Optional[str]) -> Optional[str]:
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def load_keys() -> List[SigningKey]:
+    """
+    Memuat daftar key dari file JSON `JWT_KEYS_FILE`, contoh:
+        [
+          {"kid": "2026-10", "alg": "ES256", "private_key_file": "keys/2026-10.pem", "public_key_file": "keys/2026-10.pub.pem"},
+          {"kid": "2026-04", "alg": "ES256", "public_key_file": "keys/2026-04.pub.pem"}
+        ]
+    Key simetris memakai `secret` atau `secret_env`. Tanpa `JWT_KEYS_FILE`, dipakai satu key dari
+    `JWT_SECRET_KEY`/`JWT_ALGORITHM` dengan kid "default".
+    """
+    keys_file = os.getenv("JWT_KEYS_FILE")
+    if not keys_file:
+        secret = os.getenv("JWT_SECRET_KEY")
+        return [SigningKey("default", os.getenv("JWT_ALGORITHM", "HS256"), secret, secret)]
+
+    with open(keys_file, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    keys = []
+    for entry in entries:
+        algorithm = entry["alg"]
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            secret = entry.get("secret") or os.getenv(entry.get("secret_env", ""))
+            keys.append(SigningKey(entry["kid"], algorithm, secret, secret))
+        else:
+            keys.append(SigningKey(
+                entry["kid"],
+                algorithm,
+                _read_file(entry.get("private_key_file")),
+                _read_file(entry["public_key_file"])
+            ))
+    return keys
+
+def build_token_engine() -> TokenEngine:
+    codec_name = os.getenv("JWT_CODEC", "jose").lower()
+    if codec_name not in CODECS:
+        raise ValueError(f"Unknown JWT_CODEC '{codec_name}', expected one of {sorted(CODECS)}")
+
+    keys = load_keys()
+    active_kid = os.getenv("JWT_ACTIVE_KID") or next((key.kid for key in keys if key.signing_key), None)
+    return TokenEngine(keys, active_kid, CODECS[codec_name]())
+
+
+_engine: Optional[TokenEngine] = None
+_engine_lock = threading.Lock()
+
+def get_token_engine() -> TokenEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = build_token_engine()
+    return _engine
@@ -0,0 +1,16 @@
+import threading
+from typing import Callable, Dict
+
+# Registry sederhana untuk metrics in-process.
+# Setiap subsistem mendaftarkan fungsi yang mengembalikan snapshot metrics-nya.
+_providers: Dict[str, Callable[[], dict]] = {}
+_lock = threading.Lock()
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    with _lock:
+        _providers[name] = provider
+
+def collect_metrics() -> Dict[str, dict]:
+    with _lock:
+        providers = dict(_providers)
+    return {name: provider() for name, provider in providers.items()}
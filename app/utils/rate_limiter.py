@@ -0,0 +1,142 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo import ReturnDocument
+from dotenv import load_dotenv
+
+from app.utils.metrics import register_metrics
+
+load_dotenv()
+
+class InMemoryRateLimitBackend:
+    """
+    Sliding-window log per key, disimpan di memori proses.
+    Jumlah key dibatasi `max_keys`; key yang paling lama tidak dipakai akan di-evict (LRU).
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._windows: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window_seconds: int) -> Optional[float]:
+        """Catat satu percobaan. Mengembalikan None jika diizinkan, atau sisa detik sampai boleh mencoba lagi."""
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or window.maxlen != limit:
+                window = deque(window or (), maxlen=limit)
+                self._windows[key] = window
+            self._windows.move_to_end(key)
+
+            while window and now - window[0] >= window_seconds:
+                window.popleft()
+
+            if len(window) >= limit:
+                return window_seconds - (now - window[0])
+
+            window.append(now)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+            return None
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._windows.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._windows)
+
+
+class MongoRateLimitBackend:
+    """
+    Fixed-window counter di MongoDB agar limit berlaku untuk semua worker/instance.
+    Dokumen lama dibersihkan otomatis oleh TTL index pada `expires_at`.
+    """
+
+    def __init__(self, collection_name: str = "rate_limits"):
+        from app.config.database import MongoDB
+
+        self.collection = MongoDB.get_database()[collection_name]
+        self.collection.create_index([("expires_at", 1)], expireAfterSeconds=0)
+
+    def hit(self, key: str, limit: int, window_seconds: int) -> Optional[float]:
+        now = time.time()
+        bucket = int(now // window_seconds)
+        bucket_end = (bucket + 1) * window_seconds
+        doc = self.collection.find_one_and_update(
+            {"_id": f"{key}:{bucket}"},
+            {
+                "$inc": {"count": 1},
+                "$setOnInsert": {"expires_at": datetime.fromtimestamp(bucket_end, tz=timezone.utc) + timedelta(seconds=window_seconds)}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if doc["count"] > limit:
+            return bucket_end - now
+        return None
+
+    def reset(self, key: str) -> None:
+        self.collection.delete_many({"_id": {"$regex": f"^{re.escape(key)}:"}})
+
+    def size(self) -> int:
+        return self.collection.estimated_document_count()
+
+
+class LoginRateLimiter:
+    """Rate limiter untuk endpoint login, dengan limit terpisah per IP dan per email."""
+
+    def __init__(self, backend=None):
+        self.ip_limit = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", 20))
+        self.email_limit = int(os.getenv("LOGIN_RATE_LIMIT_PER_EMAIL", 5))
+        self.window_seconds = int(os.getenv("LOGIN_RATE_LIMIT_WINDOW_SECONDS", 60))
+        self.backend = backend
+        self.admitted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _get_backend(self):
+        # Backend dibuat saat pertama dipakai agar koneksi MongoDB tidak dibuka saat import
+        if self.backend is None:
+            if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "mongo":
+                self.backend = MongoRateLimitBackend()
+            else:
+                self.backend = InMemoryRateLimitBackend(int(os.getenv("RATE_LIMIT_MAX_KEYS", 10000)))
+        return self.backend
+
+    def check(self, client_ip: str, email: str) -> Optional[float]:
+        """Mengembalikan None jika percobaan login diizinkan, atau nilai Retry-After dalam detik."""
+        backend = self._get_backend()
+        retry_after = backend.hit(f"login:ip:{client_ip}", self.ip_limit, self.window_seconds)
+        if retry_after is None:
+            retry_after = backend.hit(f"login:email:{email.lower()}", self.email_limit, self.window_seconds)
+
+        with self._lock:
+            if retry_after is None:
+                self.admitted += 1
+            else:
+                self.rejected += 1
+        return retry_after
+
+    def reset_email(self, email: str) -> None:
+        self._get_backend().reset(f"login:email:{email.lower()}")
+
+    def get_metrics(self) -> dict:
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "tracked_keys": self.backend.size() if self.backend is not None else 0,
+            "ip_limit": self.ip_limit,
+            "email_limit": self.email_limit,
+            "window_seconds": self.window_seconds
+        }
+
+
+login_rate_limiter = LoginRateLimiter()
+register_metrics("login_rate_limit", login_rate_limiter.get_metrics)
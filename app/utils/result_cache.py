@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from dotenv import load_dotenv
+
+from app.utils.metrics import register_metrics
+
+load_dotenv()
+
+class ResultCache:
+    """
+    Cache LRU untuk respons list yang sudah diserialisasi (bytes), dibatasi total ukuran byte.
+    Setiap entry menyimpan generation collection saat query dijalankan; write melalui service
+    menaikkan generation sehingga semua entry lama otomatis tidak valid.
+    TTL membatasi data basi dari write yang terjadi di proses/worker lain.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._generations = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def generation(self, collection: str) -> int:
+        return self._generations.get(collection, 0)
+
+    def bump(self, collection: str) -> None:
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+
+    def get(self, collection: str, key: Hashable) -> Optional[bytes]:
+        full_key = (collection, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                generation, stored_at, body = entry
+                if generation == self._generations.get(collection, 0) and time.monotonic() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(full_key)
+                    self.hits += 1
+                    return body
+                self._remove(full_key)
+            self.misses += 1
+            return None
+
+    def put(self, collection: str, key: Hashable, body: bytes, generation: int) -> None:
+        """Simpan body; `generation` harus dibaca sebelum query dijalankan."""
+        if len(body) > self.max_bytes:
+            return
+        full_key = (collection, key)
+        with self._lock:
+            if generation != self._generations.get(collection, 0):
+                return
+            self._remove(full_key)
+            self._entries[full_key] = (generation, time.monotonic(), body)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, full_key) -> None:
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._size -= len(entry[2])
+
+    def get_metrics(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "generations": dict(self._generations)
+        }
+
+
+list_cache = ResultCache(
+    max_bytes=int(os.getenv("LIST_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    ttl_seconds=float(os.getenv("LIST_CACHE_TTL_SECONDS", 5))
+)
+register_metrics("list_cache", list_cache.get_metrics)
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config.database import MongoDB
+from app.utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+class RevocationRegistry:
+    """
+    Daftar in-memory berisi user yang dihapus/dinonaktifkan dan `jti` access token yang dicabut.
+    Pemeriksaan per request cukup lookup set (O(1)) tanpa query database.
+    Perubahan dari proses ini langsung diterapkan; perubahan dari worker lain terbaca lewat polling
+    `updated_at` (users) dan `revoked_at` (revoked_tokens).
+    """
+
+    def __init__(self, poll_seconds: float = 2, overlap_seconds: float = 5):
+        self.poll_seconds = poll_seconds
+        # Polling mundur sedikit dari watermark agar write yang commit terlambat tidak terlewat
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.revoked_users = set()
+        self.revoked_jtis = {}
+        self._users_watermark: Optional[datetime] = None
+        self._tokens_watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._task = None
+        self.lag_samples = 0
+        self.lag_total_ms = 0.0
+        self.lag_max_ms = 0.0
+
+    # --- Pemeriksaan di hot path ---
+    def is_revoked(self, payload: dict) -> bool:
+        return payload.get("id") in self.revoked_users or payload.get("jti") in self.revoked_jtis
+
+    # --- Perubahan lokal (tanpa menunggu polling) ---
+    def revoke_user(self, user_id: str) -> None:
+        self.revoked_users.add(user_id)
+
+    def restore_user(self, user_id: str) -> None:
+        self.revoked_users.discard(user_id)
+
+    def revoke_token(self, jti: str, expires_at: datetime) -> None:
+        """Mencabut satu access token sampai waktu kedaluwarsanya."""
+        self.revoked_jtis[jti] = expires_at
+        now = datetime.now(timezone.utc)
+        MongoDB.get_database()["revoked_tokens"].update_one(
+            {"_id": jti},
+            {"$set": {"expires_at": expires_at, "revoked_at": now}},
+            upsert=True
+        )
+
+    # --- Sinkronisasi dari database ---
+    def _ensure_indexes(self) -> None:
+        db = MongoDB.get_database()
+        db["users"].create_index([("updated_at", 1)])
+        db["revoked_tokens"].create_index([("expires_at", 1)], expireAfterSeconds=0)
+        db["revoked_tokens"].create_index([("revoked_at", 1)])
+
+    def load(self) -> None:
+        """Memuat seluruh state awal saat startup."""
+        self._ensure_indexes()
+        db = MongoDB.get_database()
+        now = datetime.now(timezone.utc)
+        users = {
+            str(doc["_id"])
+            for doc in db["users"].find({"$or": [{"is_deleted": True}, {"is_active": False}]}, {"_id": 1})
+        }
+        tokens = {doc["_id"]: doc["expires_at"] for doc in db["revoked_tokens"].find({"expires_at": {"$gt": now}})}
+        with self._lock:
+            self.revoked_users = users
+            self.revoked_jtis = tokens
+            self._users_watermark = now
+            self._tokens_watermark = now
+
+    def poll(self) -> None:
+        db = MongoDB.get_database()
+        now = datetime.now(timezone.utc)
+
+        users_since = self._users_watermark - self.overlap
+        for doc in db["users"].find(
+            {"updated_at": {"$gte": users_since}},
+            {"_id": 1, "is_deleted": 1, "is_active": 1, "updated_at": 1}
+        ):
+            user_id = str(doc["_id"])
+            if doc.get("is_deleted") or doc.get("is_active") is False:
+                if user_id not in self.revoked_users:
+                    self._record_lag(now, doc["updated_at"])
+                self.revoked_users.add(user_id)
+            else:
+                self.revoked_users.discard(user_id)
+
+        tokens_since = self._tokens_watermark - self.overlap
+        for doc in db["revoked_tokens"].find({"revoked_at": {"$gte": tokens_since}}):
+            if doc["_id"] not in self.revoked_jtis:
+                self._record_lag(now, doc["revoked_at"])
+            self.revoked_jtis[doc["_id"]] = doc["expires_at"]
+
+        # Buang jti yang token-nya sudah kedaluwarsa; token tersebut sudah ditolak oleh validasi `exp`
+        for jti, expires_at in list(self.revoked_jtis.items()):
+            if _as_utc(expires_at) <= now:
+                self.revoked_jtis.pop(jti, None)
+
+        self._users_watermark = now
+        self._tokens_watermark = now
+
+    def _record_lag(self, now: datetime, changed_at: datetime) -> None:
+        """Mengukur jeda antara perubahan di database dan saat worker ini mengetahuinya."""
+        lag_ms = max(0.0, (now - _as_utc(changed_at)).total_seconds() * 1000)
+        with self._lock:
+            self.lag_samples += 1
+            self.lag_total_ms += lag_ms
+            self.lag_max_ms = max(self.lag_max_ms, lag_ms)
+
+    @property
+    def loaded(self) -> bool:
+        return self._users_watermark is not None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                # Polling baru dimulai setelah state awal berhasil dimuat; jika database belum siap, load diulang
+                await asyncio.to_thread(self.poll if self.loaded else self.load)
+            except Exception:
+                logger.exception("Revocation sync failed", extra={"loaded": self.loaded})
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "revoked_users": len(self.revoked_users),
+                "revoked_tokens": len(self.revoked_jtis),
+                "poll_seconds": self.poll_seconds,
+                "propagation_lag_samples": self.lag_samples,
+                "propagation_lag_avg_ms": round(self.lag_total_ms / self.lag_samples, 1) if self.lag_samples else None,
+                "propagation_lag_max_ms": round(self.lag_max_ms, 1)
+            }
+
+
+def _as_utc(value: datetime) -> datetime:
+    # PyMongo mengembalikan datetime naive dalam UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+revocation_registry = RevocationRegistry(
+    poll_seconds=float(os.getenv("REVOCATION_POLL_SECONDS", 2)),
+    overlap_seconds=float(os.getenv("REVOCATION_POLL_OVERLAP_SECONDS", 5))
+)
+register_metrics("revocation", revocation_registry.get_metrics)
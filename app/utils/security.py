@@ -1,12 +1,24 @@
 from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
 import os
+from uuid import uuid4
 from dotenv import load_dotenv
 
+from app.utils.jwt_engine import get_token_engine
+
 load_dotenv()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Cost factor bcrypt; gunakan `python -m app.utils.calibrate_bcrypt` untuk menentukan nilai yang sesuai hardware.
+# min/max disamakan agar hash dengan cost lain ditandai `needs_update` dan di-rehash saat login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -14,27 +26,23 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verifikasi password dan, jika hash memakai parameter lama, kembalikan hash baru.
+    Mengembalikan tuple (valid, new_hash); new_hash bernilai None jika tidak perlu di-rehash.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, 
-        os.getenv("JWT_SECRET_KEY"), 
-        algorithm=os.getenv("JWT_ALGORITHM")
-    )
-    return encoded_jwt
+    # `jti` memungkinkan satu access token dicabut sebelum kedaluwarsa
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
+    # Algoritma, key aktif (kid), dan codec ditentukan oleh token engine
+    return get_token_engine().encode(to_encode)
 
 def decode_access_token(token: str):
-    try:
-        payload = jwt.decode(
-            token, 
-            os.getenv("JWT_SECRET_KEY"), 
-            algorithms=[os.getenv("JWT_ALGORITHM")]
-        )
-        return payload
-    except JWTError:
-        return None
\ No newline at end of file
+    return get_token_engine().decode(token)
\ No newline at end of file
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from pymongo import monitoring
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Command yang bisa di-explain beserta field yang berisi filter/pipeline
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Field driver/session yang tidak boleh ikut dikirim ulang di dalam explain
+_DRIVER_FIELDS = {"lsid", "txnNumber", "writeConcern", "readConcern", "autocommit", "startTransaction"}
+
+def normalize(value):
+    """Mengganti semua literal dengan "?" sambil mempertahankan nama field dan operator."""
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Daftar nilai ($in, $nin, ...) cukup diwakili satu elemen
+        return [normalize(value[0])] if value else []
+    return "?"
+
+def query_shape(command_name: str, command: dict) -> dict:
+    shape = {"command": command_name, "collection": command.get(command_name)}
+    if command_name in ("find", "count", "distinct"):
+        shape["filter"] = normalize(command.get("filter", command.get("query", {})))
+        if "sort" in command:
+            shape["sort"] = {k: v for k, v in command["sort"].items()}
+        if "projection" in command:
+            shape["projection"] = sorted(command["projection"])
+    elif command_name == "aggregate":
+        shape["pipeline"] = normalize(command.get("pipeline", []))
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or []
+        shape["filter"] = normalize(statements[0].get("q", {})) if statements else {}
+    elif command_name == "findAndModify":
+        shape["filter"] = normalize(command.get("query", {}))
+        if "sort" in command:
+            shape["sort"] = {k: v for k, v in command["sort"].items()}
+    return shape
+
+
+class SlowQuerySampler(monitoring.CommandListener):
+    """
+    CommandListener yang mencatat command MongoDB di atas threshold, dikelompokkan per query shape.
+    Untuk setiap shape baru, explain("executionStats") dijalankan sekali di background thread.
+    Hanya `max_shapes` shape paling lambat yang disimpan.
+    """
+
+    def __init__(self, threshold_ms: float = 100, max_shapes: int = 50):
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_shapes
+        # Key (connection_id, request_id): request_id saja bisa bertabrakan antar koneksi
+        self._in_flight: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._shapes = {}
+        self._lock = threading.Lock()
+        self._explain_queue = queue.Queue(maxsize=100)
+        self._worker = None
+
+    # --- CommandListener ---
+    def started(self, event):
+        if event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        with self._lock:
+            self._in_flight[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+            # Batasi jika event succeeded/failed tidak pernah datang (misal koneksi putus)
+            while len(self._in_flight) > 10000:
+                self._in_flight.popitem(last=False)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        # Entry selalu dilepas; command gagal yang lambat (mis. melewati maxTimeMS) tetap dicatat
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool = False):
+        with self._lock:
+            started = self._in_flight.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        database_name, command = started
+        shape = query_shape(event.command_name, command)
+        key = json.dumps(shape, sort_keys=True, default=str)
+
+        is_new = False
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                is_new = True
+                entry = {"shape": shape, "count": 0, "failed": 0, "total_ms": 0.0, "max_ms": 0.0, "explain": None}
+                self._shapes[key] = entry
+            entry["count"] += 1
+            entry["failed"] += int(failed)
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = datetime.now(timezone.utc).isoformat()
+            self._evict()
+
+        if is_new and key in self._shapes:
+            self._schedule_explain(key, database_name, event.command_name, command)
+
+    def _evict(self):
+        while len(self._shapes) > self.max_shapes:
+            fastest = min(self._shapes, key=lambda k: self._shapes[k]["max_ms"])
+            del self._shapes[fastest]
+
+    # --- Explain di background ---
+    def _schedule_explain(self, key, database_name, command_name, command):
+        explain_command = {k: v for k, v in command.items() if not k.startswith("$") and k not in _DRIVER_FIELDS}
+        try:
+            self._explain_queue.put_nowait((key, database_name, explain_command))
+        except queue.Full:
+            return
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._explain_loop, name="slow-query-explain", daemon=True)
+            self._worker.start()
+
+    def _explain_loop(self):
+        from app.config.database import MongoDB
+
+        while True:
+            key, database_name, command = self._explain_queue.get()
+            try:
+                if MongoDB.client is None:
+                    continue
+                result = MongoDB.client[database_name].command(
+                    {"explain": command, "verbosity": "executionStats"}
+                )
+                summary = self._summarize_explain(result)
+            except Exception as e:
+                summary = {"error": str(e)}
+            with self._lock:
+                if key in self._shapes:
+                    self._shapes[key]["explain"] = summary
+            if summary.get("collscan"):
+                logger.warning("Slow query uses COLLSCAN", extra={"shape": key})
+
+    @staticmethod
+    def _summarize_explain(result: dict) -> dict:
+        stages = []
+
+        def walk(plan):
+            if not isinstance(plan, dict):
+                return
+            if "stage" in plan:
+                stages.append(plan["stage"] + (f"({plan['indexName']})" if "indexName" in plan else ""))
+            for child_key in ("inputStage", "queryPlan"):
+                walk(plan.get(child_key))
+            for child in plan.get("inputStages", []):
+                walk(child)
+
+        planner = result.get("queryPlanner") or result.get("stages", [{}])[0].get("$cursor", {}).get("queryPlanner", {})
+        walk(planner.get("winningPlan", {}))
+        stats = result.get("executionStats", {})
+        return {
+            "winning_plan": stages,
+            "collscan": any(stage.startswith("COLLSCAN") for stage in stages),
+            "n_returned": stats.get("nReturned"),
+            "docs_examined": stats.get("totalDocsExamined"),
+            "keys_examined": stats.get("totalKeysExamined"),
+            "execution_time_ms": stats.get("executionTimeMillis")
+        }
+
+    def get_slow_queries(self) -> list:
+        with self._lock:
+            entries = [
+                {**entry, "avg_ms": round(entry["total_ms"] / entry["count"], 2), "total_ms": round(entry["total_ms"], 2)}
+                for entry in self._shapes.values()
+            ]
+        return sorted(entries, key=lambda e: e["max_ms"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+
+slow_query_sampler = SlowQuerySampler(
+    threshold_ms=float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100)),
+    max_shapes=int(os.getenv("SLOW_QUERY_MAX_SHAPES", 50))
+)
@@ -0,0 +1,91 @@
+import asyncio
+import contextvars
+import threading
+from typing import List, Tuple
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+class InsertBatcher:
+    """
+    Menggabungkan insert yang datang bersamaan menjadi satu `insert_many(ordered=False)`.
+    Batch di-flush saat mencapai `max_batch_size` atau setelah `max_wait_ms` sejak item pertama.
+    Setiap pemanggil menerima hasilnya sendiri: `_id` dokumen, atau exception (misal DuplicateKeyError).
+    """
+
+    def __init__(self, collection, max_batch_size: int = 100, max_wait_ms: float = 5.0):
+        self.collection = collection
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._flush_handle = None
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.documents = 0
+        self.max_observed_batch = 0
+
+    async def insert(self, document: dict):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((document, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush(loop, immediate=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop, immediate=False)
+
+        return await future
+
+    def _schedule_flush(self, loop, immediate: bool):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        delay = 0 if immediate else self.max_wait_ms / 1000
+        # Context kosong: batch dipakai banyak request, jangan mewarisi deadline request yang memicunya
+        self._flush_handle = loop.call_later(delay, lambda: asyncio.ensure_future(self._flush()), context=contextvars.Context())
+
+    async def _flush(self):
+        batch, self._pending = self._pending, []
+        self._flush_handle = None
+        if not batch:
+            return
+
+        documents = [document for document, _ in batch]
+        errors = {}
+        try:
+            # insert_many bersifat blocking; jalankan di thread agar event loop tetap melayani request lain
+            await asyncio.to_thread(self.collection.insert_many, documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                if write_error.get("code") == 11000:
+                    errors[write_error["index"]] = DuplicateKeyError(write_error.get("errmsg", "duplicate key"), 11000)
+                else:
+                    errors[write_error["index"]] = e
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        with self._stats_lock:
+            self.batches += 1
+            self.documents += len(batch)
+            self.max_observed_batch = max(self.max_observed_batch, len(batch))
+
+        for index, (document, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                # PyMongo mengisi `_id` pada dokumen sebelum dikirim ke server
+                future.set_result(document["_id"])
+
+    def get_metrics(self) -> dict:
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "documents": self.documents,
+                "avg_batch_size": round(self.documents / self.batches, 2) if self.batches else 0,
+                "max_batch_size_observed": self.max_observed_batch,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms
+            }
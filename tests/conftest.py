@@ -0,0 +1,9 @@
+import os
+
+import mongomock
+import pymongo
+
+# Aplikasi membuka koneksi MongoDB saat modul di-import; arahkan ke MongoDB in-memory sebelum `app` di-import
+os.environ.setdefault("DATABASE_NAME", "university_test")
+os.environ.setdefault("SLOW_QUERY_SAMPLER_ENABLED", "false")
+pymongo.MongoClient = mongomock.MongoClient
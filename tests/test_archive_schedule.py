@@ -0,0 +1,28 @@
+import mongomock
+import pytest
+
+from app.config.database import MongoDB
+from app.services.archive_service import submit_scheduled_archive
+from app.services.job_service import job_runner
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    monkeypatch.setattr(MongoDB, "db", mongomock.MongoClient().db)
+    monkeypatch.setattr(job_runner, "_collection", None)
+    return job_runner.collection
+
+
+def test_one_archive_job_per_schedule_slot(jobs):
+    # Scheduler dari beberapa worker yang berjalan pada slot yang sama
+    results = [submit_scheduled_archive(24 * 3600) for _ in range(3)]
+
+    assert [r["success"] for r in results] == [True, False, False]
+    assert {r["error"] for r in results[1:]} == {"DUPLICATE_JOB"}
+    assert jobs.count_documents({"type": "archive"}) == 1
+
+
+def test_manual_submits_are_not_deduplicated(jobs):
+    assert job_runner.submit("archive", {})["success"]
+    assert job_runner.submit("archive", {})["success"]
+    assert jobs.count_documents({"type": "archive"}) == 2
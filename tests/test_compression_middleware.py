@@ -0,0 +1,48 @@
+import asyncio
+import zlib
+
+from app.middlewares.compression_middleware import CompressionMiddleware
+
+
+def _run(app, accept_encoding=b"gzip"):
+    middleware = CompressionMiddleware(app, minimum_size=10, encodings=["gzip"], excluded_paths=[])
+    scope = {"type": "http", "path": "/students/", "headers": [(b"accept-encoding", accept_encoding)]}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+def test_streamed_chunks_are_flushed():
+    chunks = [b"data: " + (b"%d" % i) * 40 + b"\n\n" for i in range(3)]
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = _run(app)
+    bodies = [m for m in sent if m["type"] == "http.response.body"]
+
+    # Setiap chunk harus bisa di-decode oleh klien begitu diterima, tanpa menunggu akhir respons
+    decoder = zlib.decompressobj(31)
+    for chunk, message in zip(chunks, bodies):
+        assert decoder.decompress(message["body"]) == chunk
+    assert decoder.decompress(bodies[-1]["body"]) == b""
+    assert decoder.eof
+
+
+def test_vary_header_is_merged():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"vary", b"Authorization")]})
+        await send({"type": "http.response.body", "body": b"x" * 100})
+
+    headers = [h for h in _run(app)[0]["headers"] if h[0] == b"vary"]
+    assert headers == [(b"vary", b"Authorization, Accept-Encoding")]
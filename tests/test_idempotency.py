@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+import pymongo
+from pymongo import _csot
+from pymongo.errors import ExecutionTimeout
+
+from app.utils.idempotency import IdempotencyStore
+
+
+class DeadlineAwareCollection:
+    """Meniru CSOT PyMongo: setiap operasi gagal jika deadline `pymongo.timeout()` di context saat ini sudah habis."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            remaining = _csot.remaining()
+            if remaining is not None and remaining <= 0:
+                raise ExecutionTimeout("operation exceeded time limit")
+            return attr(*args, **kwargs)
+        return call
+
+
+@pytest.fixture
+def store():
+    store = IdempotencyStore(lease_seconds=60)
+    store._collection = DeadlineAwareCollection(mongomock.MongoClient().db["idempotency_keys"])
+    return store
+
+
+async def _ok_handler():
+    return 201, {"success": True}
+
+
+def test_claim_released_when_handler_fails_after_deadline(store):
+    async def scenario():
+        async def slow_handler():
+            await asyncio.sleep(0.05)
+            raise ExecutionTimeout("request deadline exceeded")
+
+        with pymongo.timeout(0.01):
+            with pytest.raises(ExecutionTimeout):
+                await store.execute("students.create", "key-1", "hash-1", slow_handler)
+
+        # Retry dari klien (mis. setelah gateway timeout) harus diproses, bukan 409
+        return await store.execute("students.create", "key-1", "hash-1", _ok_handler)
+
+    status_code, content, replayed = asyncio.run(scenario())
+    assert status_code == 201
+    assert content == {"success": True}
+    assert replayed is False
+
+
+def test_claim_with_active_lease_is_in_progress(store):
+    now = datetime.now(timezone.utc)
+    store.collection.insert_one({
+        "_id": "students.create:key-2",
+        "request_hash": "hash-2",
+        "status": "in_progress",
+        "created_at": now,
+        "locked_until": now + timedelta(seconds=30),
+        "expires_at": now + timedelta(hours=24)
+    })
+
+    status_code, content, _ = asyncio.run(store.execute("students.create", "key-2", "hash-2", _ok_handler))
+    assert status_code == 409
+    assert content["error"] == "IDEMPOTENCY_IN_PROGRESS"
+
+
+def test_claim_with_expired_lease_is_taken_over(store):
+    now = datetime.now(timezone.utc)
+    # Klaim yang ditinggalkan worker yang crash di tengah request
+    store.collection.insert_one({
+        "_id": "students.create:key-3",
+        "request_hash": "hash-3",
+        "status": "in_progress",
+        "created_at": now - timedelta(minutes=5),
+        "locked_until": now - timedelta(minutes=4),
+        "expires_at": now + timedelta(hours=23)
+    })
+
+    status_code, _, replayed = asyncio.run(store.execute("students.create", "key-3", "hash-3", _ok_handler))
+    assert status_code == 201
+    assert replayed is False
+    assert store.collection.find_one({"_id": "students.create:key-3"})["status"] == "completed"
+    assert store.stats["taken_over"] == 1
@@ -0,0 +1,17 @@
+import pytest
+
+from app.utils.jwt_engine import JoseCodec, SigningKey, TokenEngine
+
+
+def test_eddsa_key_with_jose_codec_is_rejected_at_construction():
+    keys = [SigningKey("2026-10", "EdDSA", "private-pem", "public-pem")]
+
+    with pytest.raises(ValueError, match="JWT_CODEC=pyjwt"):
+        TokenEngine(keys, "2026-10", JoseCodec())
+
+
+def test_hs256_key_with_jose_codec_round_trips():
+    engine = TokenEngine([SigningKey("default", "HS256", "secret", "secret")], "default", JoseCodec())
+
+    token = engine.encode({"sub": "user@example.com"})
+    assert engine.decode(token) == {"sub": "user@example.com"}
@@ -0,0 +1,34 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from app.config.logging_config import JsonFormatter, NonBlockingQueueHandler
+
+
+def test_exception_traceback_is_written_to_exception_field():
+    log_queue = queue.Queue()
+    output = io.StringIO()
+    stream_handler = logging.StreamHandler(output)
+    stream_handler.setFormatter(JsonFormatter())
+    listener = QueueListener(log_queue, stream_handler)
+
+    logger = logging.getLogger("tests.logging_config")
+    logger.propagate = False
+    logger.addHandler(NonBlockingQueueHandler(log_queue))
+    listener.start()
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Unhandled exception %s", "GET /students", extra={"path": "/students"})
+    finally:
+        listener.stop()
+        logger.handlers.clear()
+
+    entry = json.loads(output.getvalue())
+    assert entry["message"] == "Unhandled exception GET /students"
+    assert entry["path"] == "/students"
+    assert "Traceback" in entry["exception"]
+    assert "ValueError: boom" in entry["exception"]
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.slow_query_sampler import SlowQuerySampler
+
+
+@pytest.fixture
+def sampler(monkeypatch):
+    sampler = SlowQuerySampler(threshold_ms=100)
+    monkeypatch.setattr(sampler, "_schedule_explain", lambda *args: None)
+    return sampler
+
+
+def _started(connection_id, request_id, collection):
+    return SimpleNamespace(
+        command_name="find",
+        connection_id=connection_id,
+        request_id=request_id,
+        database_name="university",
+        command={"find": collection, "filter": {"is_deleted": False}}
+    )
+
+
+def _finished(connection_id, request_id, duration_ms):
+    return SimpleNamespace(command_name="find", connection_id=connection_id, request_id=request_id, duration_micros=duration_ms * 1000)
+
+
+def test_overlapping_commands_on_different_connections(sampler):
+    # request_id yang sama dari dua koneksi berbeda tidak boleh saling menimpa
+    sampler.started(_started(("db1", 27017), 7, "students"))
+    sampler.started(_started(("db2", 27017), 7, "users"))
+    sampler.succeeded(_finished(("db2", 27017), 7, 5))
+    sampler.succeeded(_finished(("db1", 27017), 7, 250))
+
+    slow = sampler.get_slow_queries()
+    assert [entry["shape"]["collection"] for entry in slow] == ["students"]
+
+
+def test_failed_command_releases_in_flight_entry(sampler):
+    sampler.started(_started(("db1", 27017), 8, "students"))
+    sampler.failed(_finished(("db1", 27017), 8, 300))
+
+    assert len(sampler._in_flight) == 0
+    assert sampler.get_slow_queries()[0]["failed"] == 1
@@ -0,0 +1,80 @@
+import mongomock
+import pytest
+
+from app.config.database import MongoDB
+from app.models.student_model import StudentBulkDelete, StudentBulkUpdate
+from app.services.student_service import StudentService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(MongoDB, "db", mongomock.MongoClient().db)
+    monkeypatch.setattr(MongoDB, "_collections", {})
+    return StudentService()
+
+
+def _insert(service, nim, study_program, semester):
+    return service.collection.insert_one({
+        "nim": nim,
+        "study_program": study_program,
+        "semester": semester,
+        "is_deleted": False,
+        "version": 1
+    }).inserted_id
+
+
+def _semesters(service):
+    return {doc["nim"]: doc["semester"] for doc in service.collection.find({})}
+
+
+def test_filter_and_increment_range_both_apply(service):
+    _insert(service, "20260001", "Informatika", 1)
+    _insert(service, "20260002", "Informatika", 2)
+    _insert(service, "20260003", "Informatika", 14)
+    _insert(service, "20260004", "Sistem Informasi", 2)
+
+    result = service.bulk_update_students(StudentBulkUpdate(
+        filter={"study_program": "Informatika", "semester": 2},
+        semester_increment=1
+    ))
+
+    assert result["success"]
+    assert result["data"]["modified"] == 1
+    assert _semesters(service) == {"20260001": 1, "20260002": 3, "20260003": 14, "20260004": 2}
+
+
+def test_filter_outside_increment_range_matches_nothing(service):
+    _insert(service, "20260001", "Informatika", 14)
+    _insert(service, "20260002", "Informatika", 2)
+
+    # semester=14 cocok dengan filter, tetapi 14 + 1 di luar rentang; tidak boleh ada dokumen yang berubah
+    result = service.bulk_update_students(StudentBulkUpdate(filter={"semester": 14}, semester_increment=1))
+
+    assert result["data"]["matched"] == 0
+    assert _semesters(service) == {"20260001": 14, "20260002": 2}
+
+
+def test_ids_and_increment_range_both_apply(service):
+    in_range = _insert(service, "20260001", "Informatika", 13)
+    out_of_range = _insert(service, "20260002", "Informatika", 14)
+    untouched = _insert(service, "20260003", "Informatika", 5)
+
+    result = service.bulk_update_students(StudentBulkUpdate(ids=[str(in_range), str(out_of_range)], semester_increment=1))
+
+    assert result["data"]["modified"] == 1
+    assert [c["id"] for c in result["data"]["conflicts"]] == [str(out_of_range)]
+    assert result["data"]["conflicts"][0]["error"] == "CONSTRAINT_VIOLATION"
+    assert _semesters(service) == {"20260001": 14, "20260002": 14, "20260003": 5}
+    assert service.collection.find_one({"_id": untouched})["version"] == 1
+
+
+def test_bulk_delete_only_affects_filter_matches(service):
+    _insert(service, "20260001", "Informatika", 2)
+    _insert(service, "20260002", "Informatika", 3)
+    _insert(service, "20260003", "Sistem Informasi", 2)
+
+    result = service.bulk_soft_delete_students(StudentBulkDelete(filter={"study_program": "Informatika", "semester": 2}))
+
+    assert result["data"]["modified"] == 1
+    deleted = {doc["nim"] for doc in service.collection.find({"is_deleted": True})}
+    assert deleted == {"20260001"}